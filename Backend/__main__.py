@@ -4,10 +4,16 @@ import logging
 from traceback import format_exc
 from pyrogram import idle
 from Backend import __version__, db
+from Backend.helper.http import close_http_clients, get_session, start_http_clients
+from Backend.helper.ingest import replay_journal
+from Backend.helper.journal import journal
+from Backend.helper.metadata import tmdb
 from Backend.helper.pinger import ping
+from Backend.helper.popularity import popularity_worker
 from Backend.logger import LOGGER
 from Backend.fastapi import server
 from Backend.helper.pyro import restart_notification, setup_bot_commands
+from Backend.helper.task_manager import deletion_worker
 from Backend.pyrofork.bot import Helper, StreamBot
 from Backend.pyrofork.clients import initialize_clients
 
@@ -20,6 +26,10 @@ async def start_services():
         
         await db.connect()
         await asleep(1.2)
+
+        await start_http_clients()
+        tmdb.session = get_session()
+        await replay_journal()
         
         await StreamBot.start()
         StreamBot.username = StreamBot.me.username
@@ -41,7 +51,12 @@ async def start_services():
         LOGGER.info('Initializing Telegram-Stremio Web Server...')
         await restart_notification()
         loop.create_task(server.serve())
+        loop.create_task(journal.run())
         loop.create_task(ping())
+        loop.create_task(deletion_worker())
+        loop.create_task(db.stats_monitor())
+        loop.create_task(db.migrate_quality_schema())
+        loop.create_task(popularity_worker())
         
         LOGGER.info("Telegram-Stremio Started Successfully!")
         await idle()
@@ -61,6 +76,8 @@ async def stop_services():
         await StreamBot.stop()
         await Helper.stop()
 
+        await journal.flush()
+        await close_http_clients()
         await db.disconnect()
         
         LOGGER.info("Services stopped successfully.")
@@ -17,6 +17,50 @@ class Telegram:
 
     TMDB_API = getenv("TMDB_API", "")
 
+    DATABASE_QUOTA_MB = [int(quota) for quota in (getenv("DATABASE_QUOTA_MB") or "512").split(",") if quota.strip()]
+    DB_ROLLOVER_RATIO = float(getenv("DB_ROLLOVER_RATIO", "0.9"))
+    STATS_REFRESH_INTERVAL = int(getenv("STATS_REFRESH_INTERVAL", "120"))
+    WRITE_STRATEGY = getenv("WRITE_STRATEGY", "sequential").lower()
+    REBALANCE_TARGET_RATIO = float(getenv("REBALANCE_TARGET_RATIO", "0.7"))
+    REBALANCE_BATCH_SIZE = int(getenv("REBALANCE_BATCH_SIZE", "20"))
+    REBALANCE_DELAY = float(getenv("REBALANCE_DELAY", "1"))
+    REBALANCE_MAX_STREAMS = int(getenv("REBALANCE_MAX_STREAMS", "3"))
+
+    DELETE_RATE = float(getenv("DELETE_RATE", "0.5"))
+
+    CHUNK_CACHE_MB = int(getenv("CHUNK_CACHE_MB", "256"))
+    WARM_STREAMS = getenv("WARM_STREAMS", "True").lower() == "true"
+    PREFETCH_FIRST_CHUNK = getenv("PREFETCH_FIRST_CHUNK", "True").lower() == "true"
+    NEXT_EPISODE_PREFETCH = getenv("NEXT_EPISODE_PREFETCH", "True").lower() == "true"
+    NEXT_EPISODE_PREFETCH_AT = float(getenv("NEXT_EPISODE_PREFETCH_AT", "0.85"))
+    NEXT_EPISODE_PREFETCH_CHUNKS = int(getenv("NEXT_EPISODE_PREFETCH_CHUNKS", "2"))
+    POPULARITY_HALF_LIFE_HOURS = float(getenv("POPULARITY_HALF_LIFE_HOURS", "72"))
+    POPULARITY_FLUSH_INTERVAL = int(getenv("POPULARITY_FLUSH_INTERVAL", "60"))
+    POPULARITY_WARM_TOP = int(getenv("POPULARITY_WARM_TOP", "20"))
+    POPULARITY_WARM_HOURS = getenv("POPULARITY_WARM_HOURS", "2-7")
+
+    SPLIT_EPISODES = getenv("SPLIT_EPISODES", "False").lower() == "true"
+
+    INGEST_WORKERS = int(getenv("INGEST_WORKERS", "4"))
+    INGEST_BATCH_SIZE = int(getenv("INGEST_BATCH_SIZE", "50"))
+    INGEST_BATCH_WAIT = float(getenv("INGEST_BATCH_WAIT", "2"))
+    INGEST_JOURNAL_PATH = getenv("INGEST_JOURNAL_PATH", "ingest_journal.jsonl")
+    INGEST_JOURNAL_FLUSH_INTERVAL = float(getenv("INGEST_JOURNAL_FLUSH_INTERVAL", "0.5"))
+    INGEST_JOURNAL_BATCH = int(getenv("INGEST_JOURNAL_BATCH", "200"))
+    INGEST_JOURNAL_COMPACT_AFTER = int(getenv("INGEST_JOURNAL_COMPACT_AFTER", "5000"))
+    METADATA_WORKERS = int(getenv("METADATA_WORKERS", "6"))
+    BACKFILL_CONCURRENCY = int(getenv("BACKFILL_CONCURRENCY", "0"))
+    BACKFILL_EMPTY_BATCHES = int(getenv("BACKFILL_EMPTY_BATCHES", "5"))
+    BACKFILL_MAX_PENDING = int(getenv("BACKFILL_MAX_PENDING", "500"))
+    METADATA_RETRIES = int(getenv("METADATA_RETRIES", "4"))
+    CINEMETA_RATE = float(getenv("CINEMETA_RATE", "5"))
+    TMDB_RATE = float(getenv("TMDB_RATE", "20"))
+    METADATA_CACHE_TTL = int(getenv("METADATA_CACHE_TTL", "604800"))
+    METADATA_NEGATIVE_TTL = int(getenv("METADATA_NEGATIVE_TTL", "21600"))
+    HTTP_MAX_CONNECTIONS = int(getenv("HTTP_MAX_CONNECTIONS", "50"))
+    HTTP_MAX_KEEPALIVE = int(getenv("HTTP_MAX_KEEPALIVE", "20"))
+    HTTP_KEEPALIVE_EXPIRY = float(getenv("HTTP_KEEPALIVE_EXPIRY", "60"))
+
     UPSTREAM_REPO = getenv("UPSTREAM_REPO", "")
     UPSTREAM_BRANCH = getenv("UPSTREAM_BRANCH", "")
 
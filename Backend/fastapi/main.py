@@ -1,9 +1,11 @@
+from typing import Optional
 from fastapi import FastAPI, Request, Form, Depends, Query
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from starlette.middleware.sessions import SessionMiddleware
 from Backend import __version__
+from Backend.fastapi.responses import FastJSONResponse
 
 from Backend.fastapi.security.credentials import require_auth
 from Backend.fastapi.routes.stream_routes import router as stream_router
@@ -15,13 +17,16 @@ from Backend.fastapi.routes.template_routes import (
 from Backend.fastapi.routes.api_routes import (
     list_media_api, delete_media_api, update_media_api,
     delete_movie_quality_api, delete_tv_quality_api,
-    delete_tv_episode_api, delete_tv_season_api
+    delete_tv_episode_api, delete_tv_season_api,
+    start_rebalance_api, rebalance_status_api,
+    start_backfill_api, stop_backfill_api, backfill_status_api
 )
 
 app = FastAPI(
     title="Telegram Stremio Media Server",
     description="A powerful, self-hosted Telegram Stremio Media Server built with FastAPI, MongoDB, and PyroFork seamlessly integrated with Stremio for automated media streaming and discovery.",
-    version=__version__
+    version=__version__,
+    default_response_class=FastJSONResponse
 )
 
 # --- Middleware Setup ---
@@ -132,6 +137,63 @@ async def get_workloads(_: bool = Depends(require_auth)):
         return {"loads": {}}
 
 
+@app.get("/api/system/stream-cache")
+async def get_stream_cache(_: bool = Depends(require_auth)):
+    from Backend.helper.custom_dl import chunk_cache
+    from Backend.fastapi.routes.stream_routes import resolved_streams, stream_stats
+    return {"chunks": chunk_cache.stats(), "resolved": len(resolved_streams), **stream_stats}
+
+
+@app.get("/api/system/ingest")
+async def get_ingest_stats(_: bool = Depends(require_auth)):
+    from Backend.helper.ingest import file_queue, ingest_stats, metadata_queue
+    from Backend.helper.journal import journal
+    from Backend.helper.metadata_cache import metadata_cache
+    from Backend.helper.parser import get_parse_stats
+    from Backend.helper.providers import get_provider_stats
+    return {
+        "pending_metadata": metadata_queue.qsize(),
+        "pending_writes": file_queue.qsize(),
+        **ingest_stats,
+        "providers": get_provider_stats(),
+        "metadata_cache": metadata_cache.get_stats(),
+        "parser": get_parse_stats(),
+        "journal": journal.get_stats()
+    }
+
+
+@app.get("/api/system/popularity")
+async def get_popularity(limit: int = 20, _: bool = Depends(require_auth)):
+    from Backend.helper.popularity import popularity
+    return {
+        "files": [{"id": id, "score": round(score, 3)} for id, score in popularity.top_files(limit)],
+        "movies": [{"tmdb_id": tmdb_id, "score": round(score, 3)} for tmdb_id, score in popularity.top_titles("movie", limit)],
+        "tv": [{"tmdb_id": tmdb_id, "score": round(score, 3)} for tmdb_id, score in popularity.top_titles("tv", limit)]
+    }
+
+
+@app.post("/api/system/rebalance")
+async def start_rebalance(_: bool = Depends(require_auth)):
+    return await start_rebalance_api()
+
+@app.get("/api/system/rebalance")
+async def rebalance_status(_: bool = Depends(require_auth)):
+    return await rebalance_status_api()
+
+
+@app.post("/api/system/backfill")
+async def start_backfill(chat_id: int, start_id: Optional[int] = None, end_id: Optional[int] = None, _: bool = Depends(require_auth)):
+    return await start_backfill_api(chat_id, start_id, end_id)
+
+@app.delete("/api/system/backfill")
+async def stop_backfill(_: bool = Depends(require_auth)):
+    return await stop_backfill_api()
+
+@app.get("/api/system/backfill")
+async def backfill_status(chat_id: Optional[int] = None, _: bool = Depends(require_auth)):
+    return await backfill_status_api(chat_id)
+
+
 @app.exception_handler(401)
 async def auth_exception_handler(request: Request, exc):
     return RedirectResponse(url="/login", status_code=302)
@@ -0,0 +1,37 @@
+import json
+from datetime import date, datetime
+from typing import Any
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode a payload straight from Mongo documents, ObjectId and datetime included."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse backed by orjson (stdlib json when it is not installed).
+
+    Only handlers that return a FastJSONResponse explicitly skip FastAPI's
+    jsonable_encoder pass; routes returning a plain dict are still encoded
+    by FastAPI as before.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -1,5 +1,10 @@
+from typing import Optional
 from fastapi import Request, Query, HTTPException
 from Backend import db
+from Backend.config import Telegram
+from Backend.fastapi.responses import FastJSONResponse
+from Backend.helper.backfill import backfill_status, start_backfill, stop_backfill
+from Backend.helper.rebalancer import rebalance_status, start_rebalance
 
 # --- API Routes for Media Management ---
 
@@ -11,24 +16,18 @@ async def list_media_api(
 ):
     try:
         if search:
-            result = await db.search_documents(search, page, page_size)
-            filtered_results = [item for item in result['results'] if item.get('media_type') == media_type]
-            total_filtered = len(filtered_results)
-            start_index = (page - 1) * page_size
-            end_index = start_index + page_size
-            paged_results = filtered_results[start_index:end_index]
-            
-            return {
-                "total_count": total_filtered,
+            result = await db.search_documents(search, page, page_size, media_type=media_type)
+            return FastJSONResponse({
+                "total_count": result["total_count"],
                 "current_page": page,
-                "total_pages": (total_filtered + page_size - 1) // page_size,
-                "movies" if media_type == "movie" else "tv_shows": paged_results
-            }
+                "total_pages": result["total_pages"],
+                "movies" if media_type == "movie" else "tv_shows": result["results"]
+            })
         else:
             if media_type == "movie":
-                return await db.sort_movies([], page, page_size)
+                return FastJSONResponse(await db.sort_movies([], page, page_size))
             else:
-                return await db.sort_tv_shows([], page, page_size)
+                return FastJSONResponse(await db.sort_tv_shows([], page, page_size))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -113,7 +112,7 @@ async def get_media_details_api(
     try:
         result = await db.get_document(media_type, tmdb_id, db_index)
         if result:
-            return result
+            return FastJSONResponse(result)
         else:
             raise HTTPException(status_code=404, detail="Media not found")
     except Exception as e:
@@ -162,3 +161,41 @@ async def delete_tv_season_api(tmdb_id: int, db_index: int, season: int):
             raise HTTPException(status_code=404, detail="Season not found")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+async def start_rebalance_api():
+    if not start_rebalance():
+        raise HTTPException(status_code=409, detail="Rebalance already running")
+    return {"message": "Rebalance started"}
+
+async def rebalance_status_api():
+    checkpoint = await db.get_state("rebalance") or {}
+    checkpoint.pop("_id", None)
+    checkpoint.pop("last_id", None)
+    return {
+        **rebalance_status,
+        "checkpoint": checkpoint,
+        "capacity": {
+            f"storage_{db_index}": {"ratio": round(sample["ratio"], 4), "used": sample["used"], "quota": sample["quota"]}
+            for db_index, sample in db.capacity.items()
+        }
+    }
+
+async def start_backfill_api(chat_id: int, start_id: Optional[int] = None, end_id: Optional[int] = None):
+    if str(chat_id) not in Telegram.AUTH_CHANNEL:
+        raise HTTPException(status_code=400, detail="Channel is not in AUTH_CHANNEL")
+    if not start_backfill(chat_id, start_id, end_id):
+        raise HTTPException(status_code=409, detail="Backfill already running")
+    return {"message": "Backfill started"}
+
+async def stop_backfill_api():
+    if not stop_backfill():
+        raise HTTPException(status_code=409, detail="No backfill running")
+    return {"message": "Backfill stopping"}
+
+async def backfill_status_api(chat_id: Optional[int] = None):
+    chat_id = chat_id or backfill_status["chat_id"]
+    checkpoint = await db.get_state(f"backfill:{chat_id}") if chat_id else None
+    return {
+        **backfill_status,
+        "saved_checkpoint": (checkpoint or {}).get("last_msg_id")
+    }
@@ -1,18 +1,165 @@
 import math
 import secrets
 import mimetypes
-from typing import Tuple
+from asyncio import Semaphore, create_task
+from collections import OrderedDict
+from typing import AsyncGenerator, Iterable, Optional, Tuple
 from fastapi import APIRouter, Request, HTTPException
 from fastapi.responses import StreamingResponse
 
+from Backend import db
+from Backend.config import Telegram
+from Backend.logger import LOGGER
 from Backend.helper.encrypt import decode_string
 from Backend.helper.exceptions import InvalidHash
 from Backend.helper.custom_dl import ByteStreamer
+from Backend.helper.popularity import popularity
 from Backend.pyrofork.bot import StreamBot, work_loads, multi_clients
 
 router = APIRouter(tags=["Streaming"])
 class_cache = {}
 
+RESOLVED_STREAMS_MAX = 4096
+resolved_streams: "OrderedDict[str, dict]" = OrderedDict()
+stream_stats = {"resolve_hits": 0, "resolve_misses": 0, "warmed": 0, "warm_errors": 0, "next_episode_prefetches": 0}
+_warming = set()
+_warm_slots = Semaphore(4)
+
+EPISODE_CONTEXT_MAX = 4096
+episode_context: "OrderedDict[str, dict]" = OrderedDict()
+_next_episode_slots = Semaphore(1)
+
+
+def get_streamer(index: int) -> ByteStreamer:
+    client = multi_clients[index]
+    tg_connect = class_cache.get(client)
+    if not tg_connect:
+        tg_connect = ByteStreamer(client)
+        class_cache[client] = tg_connect
+    return tg_connect
+
+
+async def resolve_stream(id: str) -> dict:
+    """Map an encoded stream id to its chat, message and hash, remembering the answer."""
+    entry = resolved_streams.get(id)
+    if entry:
+        resolved_streams.move_to_end(id)
+        stream_stats["resolve_hits"] += 1
+        return entry
+
+    stream_stats["resolve_misses"] += 1
+    decoded_data = await decode_string(id)
+    if not decoded_data.get("msg_id"):
+        raise HTTPException(status_code=400, detail="Missing id")
+
+    chat_id = int(f"-100{decoded_data['chat_id']}")
+    msg_id = int(decoded_data["msg_id"])
+    message = await StreamBot.get_messages(chat_id, msg_id)
+    file = message.video or message.document
+    entry = {"chat_id": chat_id, "msg_id": msg_id, "secure_hash": file.file_unique_id[:6], "index": None}
+
+    resolved_streams[id] = entry
+    while len(resolved_streams) > RESOLVED_STREAMS_MAX:
+        resolved_streams.popitem(last=False)
+    return entry
+
+
+async def warm_stream(id: str, prefetch: bool = True, chunks: int = 1):
+    try:
+        async with _warm_slots:
+            entry = await resolve_stream(id)
+            index = min(work_loads, key=work_loads.get)
+            streamer = get_streamer(index)
+            file_id = await streamer.get_file_properties(chat_id=entry["chat_id"], message_id=entry["msg_id"])
+            if prefetch:
+                chunk_size = 1024 * 1024
+                await streamer.prefetch(file_id, [part * chunk_size for part in range(chunks)], chunk_size)
+            else:
+                await streamer.generate_media_session(streamer.client, file_id)
+            entry["index"] = index
+            stream_stats["warmed"] += 1
+    except Exception as e:
+        stream_stats["warm_errors"] += 1
+        LOGGER.debug(f"Stream warm-up failed for {id}: {e}")
+    finally:
+        _warming.discard(id)
+
+
+def remember_episode(id: str, tmdb_id: int, season_number: int, episode_number: int, quality: Optional[str]):
+    episode_context[id] = {
+        "tmdb_id": tmdb_id,
+        "season_number": season_number,
+        "episode_number": episode_number,
+        "quality": quality,
+        "next_scheduled": False
+    }
+    episode_context.move_to_end(id)
+    while len(episode_context) > EPISODE_CONTEXT_MAX:
+        episode_context.popitem(last=False)
+
+
+async def _find_next_episode(tmdb_id: int, season_number: int, episode_number: int):
+    for season, episode in ((season_number, episode_number + 1), (season_number + 1, 1)):
+        details = await db.get_media_details(
+            tmdb_id=tmdb_id, season_number=season, episode_number=episode, media_type="tv"
+        )
+        if details and details.get("telegram"):
+            return season, episode, details["telegram"]
+    return None
+
+
+async def prefetch_next_episode(id: str):
+    context = episode_context.get(id)
+    if not context:
+        return
+    try:
+        # One at a time: this is speculative work and must not compete with
+        # the warm-ups for links the user is actually looking at.
+        async with _next_episode_slots:
+            found = await _find_next_episode(
+                context["tmdb_id"], context["season_number"], context["episode_number"]
+            )
+            if not found:
+                return
+            season, episode, qualities = found
+            quality = next((q for q in qualities if q.get("quality") == context["quality"]), qualities[0])
+            next_id = quality.get("id")
+            if not next_id or next_id in _warming:
+                return
+            remember_episode(next_id, context["tmdb_id"], season, episode, quality.get("quality"))
+            _warming.add(next_id)
+            stream_stats["next_episode_prefetches"] += 1
+            await warm_stream(next_id, prefetch=True, chunks=Telegram.NEXT_EPISODE_PREFETCH_CHUNKS)
+    except Exception as e:
+        LOGGER.debug(f"Next episode prefetch failed for {id}: {e}")
+
+
+async def track_playback(
+    body: AsyncGenerator[bytes, None], id: str, position: int, file_size: int
+) -> AsyncGenerator[bytes, None]:
+    # Players usually send one open-ended range, so progress is measured from
+    # the bytes actually delivered rather than from the Range header.
+    threshold = file_size * Telegram.NEXT_EPISODE_PREFETCH_AT
+    try:
+        async for chunk in body:
+            position += len(chunk)
+            context = episode_context.get(id)
+            if context and not context["next_scheduled"] and position >= threshold:
+                context["next_scheduled"] = True
+                create_task(prefetch_next_episode(id))
+            yield chunk
+    finally:
+        await body.aclose()
+
+
+def schedule_warm(ids: Iterable[str]):
+    if not Telegram.WARM_STREAMS:
+        return
+    for id in ids:
+        if id and id not in _warming:
+            _warming.add(id)
+            create_task(warm_stream(id, prefetch=Telegram.PREFETCH_FIRST_CHUNK))
+
 
 def parse_range_header(range_header: str, file_size: int) -> Tuple[int, int]:
     if not range_header:
@@ -38,20 +185,15 @@ def parse_range_header(range_header: str, file_size: int) -> Tuple[int, int]:
 @router.get("/dl/{id}/{name}")
 @router.head("/dl/{id}/{name}")
 async def stream_handler(request: Request, id: str, name: str):
-    decoded_data = await decode_string(id)
-    if not decoded_data.get("msg_id"):
-        raise HTTPException(status_code=400, detail="Missing id")
-
-    chat_id = f"-100{decoded_data['chat_id']}"
-    message = await StreamBot.get_messages(int(chat_id), int(decoded_data["msg_id"]))
-    file = message.video or message.document
-    file_hash = file.file_unique_id[:6]
+    entry = await resolve_stream(id)
 
     return await media_streamer(
         request,
-        chat_id=int(chat_id),
-        id=int(decoded_data["msg_id"]),
-        secure_hash=file_hash
+        chat_id=entry["chat_id"],
+        id=entry["msg_id"],
+        secure_hash=entry["secure_hash"],
+        preferred_index=entry["index"],
+        stream_id=id
     )
 
 
@@ -60,15 +202,16 @@ async def media_streamer(
     chat_id: int,
     id: int,
     secure_hash: str,
+    preferred_index: Optional[int] = None,
+    stream_id: Optional[str] = None,
 ) -> StreamingResponse:
     range_header = request.headers.get("Range", "")
     index = min(work_loads, key=work_loads.get)
-    faster_client = multi_clients[index]
-
-    tg_connect = class_cache.get(faster_client)
-    if not tg_connect:
-        tg_connect = ByteStreamer(faster_client)
-        class_cache[faster_client] = tg_connect
+    # The client that was warmed for this file already holds its FileId and
+    # media session; keep it unless it is clearly busier than the idlest one.
+    if preferred_index in work_loads and work_loads[preferred_index] <= work_loads[index] + 1:
+        index = preferred_index
+    tg_connect = get_streamer(index)
 
     file_id = await tg_connect.get_file_properties(chat_id=chat_id, message_id=id)
     if file_id.unique_id[:6] != secure_hash:
@@ -87,6 +230,11 @@ async def media_streamer(
     body = tg_connect.yield_file(
         file_id, index, offset, first_part_cut, last_part_cut, part_count, chunk_size
     )
+    # Count a play when a client opens the file, not on every seek.
+    if stream_id and from_bytes < chunk_size and request.method != "HEAD":
+        popularity.record(stream_id)
+    if Telegram.NEXT_EPISODE_PREFETCH and stream_id in episode_context and request.method != "HEAD":
+        body = track_playback(body, stream_id, from_bytes, file_size)
 
     file_name = file_id.file_name or f"{secrets.token_hex(2)}.unknown"
     mime_type = file_id.mime_type or mimetypes.guess_type(file_name)[0] or "application/octet-stream"
@@ -1,14 +1,22 @@
-from fastapi import APIRouter, HTTPException
-from typing import Optional
+from fastapi import APIRouter, HTTPException, Request, Response
+from typing import Awaitable, Callable, Hashable, Optional, Tuple
 from urllib.parse import unquote
 from Backend.config import Telegram
 from Backend import db, __version__
+from Backend.fastapi.responses import FastJSONResponse, dumps
+from Backend.fastapi.routes.stream_routes import remember_episode, schedule_warm
+from Backend.helper.catalog import catalog
+from Backend.helper.popularity import popularity
+from Backend.helper.response_cache import ResponseCache, etag_matches, make_etag
 
 # --- Configuration ---
 BASE_URL = Telegram.BASE_URL
 ADDON_NAME = "Telegram"
 ADDON_VERSION = __version__
 PAGE_SIZE = 15
+MANIFEST_CACHE_CONTROL = "public, max-age=3600"
+CATALOG_CACHE_CONTROL = "public, max-age=60, stale-while-revalidate=600"
+META_CACHE_CONTROL = "public, max-age=300, stale-while-revalidate=3600"
 
 router = APIRouter(prefix="/stremio", tags=["Stremio Addon"])
 
@@ -20,10 +28,38 @@ GENRES = [
     "Sci-Fi", "Sport", "Thriller", "War", "Western"
 ]
 
+response_cache = ResponseCache()
+
 # --- Helper Functions ---
+async def cached_json(
+    request: Request, key: str, cache_control: str,
+    build: Callable[[], Awaitable[dict]], generation: Optional[Hashable] = None
+) -> Response:
+    # Entries are only reused while the library generation is unchanged; with
+    # no loaded catalog there is nothing to invalidate against, so skip caching.
+    if generation is None and catalog.loaded:
+        generation = catalog.generation
+    cached = response_cache.get(key, generation) if generation is not None else None
+    if cached:
+        etag, body = cached
+    else:
+        body = dumps(await build())
+        etag = response_cache.put(key, generation, body) if generation is not None else make_etag(body)
+
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def parse_stremio_id(stremio_id: str) -> Tuple[int, Optional[int]]:
+    # Ids are the bare tmdb_id; the legacy "tmdb_id-db_index" form is still
+    # accepted and its db_index only used as a lookup hint.
+    tmdb_id_str, _, db_index_str = stremio_id.partition("-")
+    return int(tmdb_id_str), int(db_index_str) if db_index_str else None
+
 def convert_to_stremio_meta(item: dict) -> dict:
     media_type = "series" if item.get("media_type") == "tv" else "movie"
-    stremio_id = f"{item.get('tmdb_id')}-{item.get('db_index')}"
+    stremio_id = str(item.get("tmdb_id"))
     
     return {
         "id": stremio_id,
@@ -40,7 +76,10 @@ def convert_to_stremio_meta(item: dict) -> dict:
 
 # --- Stremio Endpoints ---
 @router.get("/manifest.json")
-async def get_manifest():
+async def get_manifest(request: Request):
+    return await cached_json(request, "manifest", MANIFEST_CACHE_CONTROL, build_manifest, generation=ADDON_VERSION)
+
+async def build_manifest() -> dict:
     return {
         "id": "telegram.media",
         "version": ADDON_VERSION,
@@ -80,6 +119,13 @@ async def get_manifest():
                 ],
                 "extraSupported": ["genre", "skip", "search"]
             },
+            {
+                "type": "movie",
+                "id": "trending_movies",
+                "name": "Trending",
+                "extra": [{"name": "skip"}],
+                "extraSupported": ["skip"]
+            },
             # Series Catalogs
             {
                 "type": "series",
@@ -95,6 +141,13 @@ async def get_manifest():
                 ],
                 "extraSupported": ["genre", "skip"]
             },
+            {
+                "type": "series",
+                "id": "trending_series",
+                "name": "Trending",
+                "extra": [{"name": "skip"}],
+                "extraSupported": ["skip"]
+            },
             {
                 "type": "series",
                 "id": "top_series",
@@ -120,7 +173,7 @@ async def get_manifest():
     
 @router.get("/catalog/{media_type}/{id}/{extra:path}.json")
 @router.get("/catalog/{media_type}/{id}.json")
-async def get_catalog(media_type: str, id: str, extra: Optional[str] = None):
+async def get_catalog(request: Request, media_type: str, id: str, extra: Optional[str] = None):
     if media_type not in ["movie", "series"]:
         raise HTTPException(status_code=404, detail="Invalid catalog type")
     
@@ -142,44 +195,77 @@ async def get_catalog(media_type: str, id: str, extra: Optional[str] = None):
                     stremio_skip = 0
     
     page = (stremio_skip // PAGE_SIZE) + 1
-    
-    try:
-        if search_query:
-            search_results = await db.search_documents(query=search_query, page=page, page_size=PAGE_SIZE)
-            all_items = search_results.get("results", [])
-            db_media_type = "tv" if media_type == "series" else "movie"
-            items = [item for item in all_items if item.get("media_type") == db_media_type]
-        else:
-            if "latest" in id:
-                sort_params = [("updated_on", "desc")]
-            elif "top" in id:
-                sort_params = [("rating", "desc")]
-            else:
-                sort_params = [("updated_on", "desc")]
-            
-            if media_type == "movie":
-                data = await db.sort_movies(sort_params, page, PAGE_SIZE, genre_filter=genre_filter)
-                items = data.get("movies", [])
-            else:
-                data = await db.sort_tv_shows(sort_params, page, PAGE_SIZE, genre_filter=genre_filter)
-                items = data.get("tv_shows", [])
+    search_query = " ".join(search_query.split()).lower() if search_query else None
+    key = f"catalog:{media_type}:{id}:{genre_filter or ''}:{search_query or ''}:{page}"
 
+    try:
+        # Trending moves with play counts, not only with library changes.
+        generation = (catalog.generation, popularity.generation) if "trending" in id else None
+        return await cached_json(
+            request, key, CATALOG_CACHE_CONTROL,
+            lambda: build_catalog(media_type, id, genre_filter, search_query, page),
+            generation=generation
+        )
     except Exception as e:
         print(f"Error fetching catalog data: {e}")
         return {"metas": []}
-    
+
+async def build_catalog(
+    media_type: str, id: str, genre_filter: Optional[str], search_query: Optional[str], page: int
+) -> dict:
+    db_media_type = "tv" if media_type == "series" else "movie"
+    if search_query:
+        search_results = await db.search_documents(
+            query=search_query, page=page, page_size=PAGE_SIZE, media_type=db_media_type
+        )
+        items = search_results.get("results", [])
+    elif "trending" in id:
+        ranked = [
+            catalog.items[(db_media_type, tmdb_id)]
+            for tmdb_id, _ in popularity.top_titles(db_media_type, len(popularity.titles))
+            if (db_media_type, tmdb_id) in catalog.items
+        ]
+        items = [item.to_dict() for item in ranked[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]]
+    else:
+        if "latest" in id:
+            sort_params = [("updated_on", "desc")]
+        elif "top" in id:
+            sort_params = [("rating", "desc")]
+        else:
+            sort_params = [("updated_on", "desc")]
+        
+        if catalog.loaded:
+            items = catalog.page(
+                db_media_type, sort_params[0][0], genre_filter, (page - 1) * PAGE_SIZE, PAGE_SIZE
+            )
+        elif media_type == "movie":
+            data = await db.sort_movies(sort_params, page, PAGE_SIZE, genre_filter=genre_filter)
+            items = data.get("movies", [])
+        else:
+            data = await db.sort_tv_shows(sort_params, page, PAGE_SIZE, genre_filter=genre_filter)
+            items = data.get("tv_shows", [])
+
     metas = [convert_to_stremio_meta(item) for item in items]
     return {"metas": metas}
 
 @router.get("/meta/{media_type}/{id}.json")
-async def get_meta(media_type: str, id: str):
+async def get_meta(request: Request, media_type: str, id: str):
     try:
-        tmdb_id_str, db_index_str = id.split("-")
-        tmdb_id, db_index = int(tmdb_id_str), int(db_index_str)
-    except (ValueError, IndexError):
+        tmdb_id, db_index = parse_stremio_id(id)
+    except ValueError:
         raise HTTPException(status_code=400, detail="Invalid Stremio ID format")
-    
-    media = await db.get_media_details(tmdb_id=tmdb_id, db_index=db_index)
+
+    return await cached_json(
+        request, f"meta:{media_type}:{id}", META_CACHE_CONTROL,
+        lambda: build_meta(media_type, id, tmdb_id, db_index)
+    )
+
+async def build_meta(media_type: str, id: str, tmdb_id: int, db_index: Optional[int]) -> dict:
+    media = await db.get_media_details(
+        tmdb_id=tmdb_id,
+        db_index=db_index,
+        media_type="tv" if media_type == "series" else "movie"
+    )
     
     if not media:
         return {"meta": {}}
@@ -225,7 +311,7 @@ async def get_streams(media_type: str, id: str):
         base_id = parts[0]
         season_num = int(parts[1]) if len(parts) > 1 else None
         episode_num = int(parts[2]) if len(parts) > 2 else None
-        tmdb_id, db_index = map(int, base_id.split("-"))
+        tmdb_id, db_index = parse_stremio_id(base_id)
     except (ValueError, IndexError):
         raise HTTPException(status_code=400, detail="Invalid Stremio ID format")
     
@@ -233,11 +319,12 @@ async def get_streams(media_type: str, id: str):
         tmdb_id=tmdb_id,
         db_index=db_index,
         season_number=season_num,
-        episode_number=episode_num
+        episode_number=episode_num,
+        media_type="tv" if media_type == "series" else "movie"
     )
     
     if not media_details or "telegram" not in media_details:
-        return {"streams": []}
+        return FastJSONResponse({"streams": []})
     
     streams = [
         {
@@ -249,4 +336,15 @@ async def get_streams(media_type: str, id: str):
         if quality.get("id")
     ]
     
-    return {"streams": streams}
+    for quality in media_details.get("telegram", []):
+        if quality.get("id"):
+            popularity.register(quality["id"], media_type, tmdb_id)
+
+    if season_num is not None and episode_num is not None:
+        for quality in media_details.get("telegram", []):
+            if quality.get("id"):
+                remember_episode(quality["id"], tmdb_id, season_num, episode_num, quality.get("quality"))
+
+    # Playback of one of these links usually follows within seconds.
+    schedule_warm(quality.get("id") for quality in media_details.get("telegram", []))
+    return FastJSONResponse({"streams": streams})
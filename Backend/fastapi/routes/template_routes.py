@@ -6,6 +6,7 @@ from Backend.fastapi.themes import get_theme, get_all_themes
 from Backend import db
 from Backend.pyrofork.bot import work_loads, multi_clients, StreamBot
 from Backend.helper.pyro import get_readable_time
+from Backend.helper.task_manager import deletion_stats
 from Backend import StartTime, __version__
 from time import time
 
@@ -77,7 +78,9 @@ async def dashboard_page(request: Request, _: bool = Depends(require_auth)):
             "tv_shows": total_tv_shows,
             "databases": db_stats,
             "total_databases": len(db_stats),
-            "current_db_index": db.current_db_index
+            "current_db_index": db.current_db_index,
+            "stats_updated_on": db.stats_cache["updated_on"],
+            "deletion_queue": {**db.stats_cache["deletion_queue"], **deletion_stats}
         }
     except Exception as e:
         print(f"Dashboard error: {e}")
@@ -93,7 +96,8 @@ async def dashboard_page(request: Request, _: bool = Depends(require_auth)):
             "tv_shows": 0,
             "databases": [],
             "total_databases": 0,
-            "current_db_index": 1
+            "current_db_index": 1,
+            "deletion_queue": {}
         }
     
     return templates.TemplateResponse("dashboard.html", {
@@ -157,7 +161,8 @@ async def public_status_page(request: Request):
             "status": "operational",
             "uptime": "99.9%",
             "total_content": total_movies + total_tv_shows,
-            "databases_online": len(db_stats)
+            "databases_online": len(db_stats),
+            "updated_on": db.stats_cache["updated_on"]
         }
     except Exception:
         public_stats = {
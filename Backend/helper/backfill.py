@@ -0,0 +1,189 @@
+from asyncio import create_task, gather, sleep
+from datetime import datetime
+from typing import Optional
+from pyrogram import Client
+from pyrogram.errors import FloodWait
+from Backend import db
+from Backend.config import Telegram
+from Backend.helper.ingest import enqueue_job, make_job, metadata_queue
+from Backend.helper.parser import parse_batch
+from Backend.logger import LOGGER
+from Backend.pyrofork.bot import multi_clients
+
+
+BATCH_SIZE = 200  # get_messages limit per call
+
+backfill_status = {
+    "state": "idle",
+    "chat_id": None,
+    "scanned": 0,
+    "queued": 0,
+    "skipped": 0,
+    "unparseable": 0,
+    "checkpoint": None,
+    "flood_waits": 0,
+    "started_on": None,
+    "updated_on": None,
+    "error": None
+}
+_backfill_task = None
+
+
+def _set_status(**fields):
+    backfill_status.update(fields, updated_on=datetime.utcnow())
+
+
+def _is_video(message) -> bool:
+    return bool(message.video or (message.document and (message.document.mime_type or "").startswith("video/")))
+
+
+class _Scan:
+    """Batch bookkeeping shared by the per-client workers."""
+
+    def __init__(self, start_id: int, end_id: Optional[int]):
+        self.next_start = start_id
+        self.end_id = end_id
+        self.last_seen = start_id - 1
+        self.checkpoint = start_id - 1
+        self.completed = set()
+        self.in_flight = 0
+
+    def claim(self) -> Optional[int]:
+        # Without an explicit end, stop once this many ids past the newest
+        # message seen have all come back empty.
+        limit = self.end_id if self.end_id else self.last_seen + Telegram.BACKFILL_EMPTY_BATCHES * BATCH_SIZE
+        if self.next_start > limit:
+            return None
+        start = self.next_start
+        self.next_start += BATCH_SIZE
+        self.in_flight += 1
+        return start
+
+    def complete(self, start: int) -> bool:
+        # Batches finish out of order; the checkpoint only moves over a
+        # contiguous run so a resume never skips an unfinished batch.
+        self.in_flight -= 1
+        self.completed.add(start)
+        moved = False
+        while self.checkpoint + 1 in self.completed:
+            self.completed.discard(self.checkpoint + 1)
+            self.checkpoint += BATCH_SIZE
+            moved = True
+        return moved
+
+    @property
+    def resume_point(self) -> int:
+        # The empty probe batches past the newest message also complete; ids
+        # there can still be used by later posts, so never persist past it.
+        return min(self.checkpoint, self.last_seen)
+
+
+async def _fetch(client: Client, chat_id: int, start: int, end: int):
+    while True:
+        try:
+            return await client.get_messages(chat_id, list(range(start, end + 1)))
+        except FloodWait as e:
+            _set_status(flood_waits=backfill_status["flood_waits"] + 1)
+            LOGGER.info(f"Backfill FloodWait on client: sleeping {e.value}s")
+            await sleep(e.value)
+
+
+async def _worker(client: Client, chat_id: int, scan: _Scan, indexed: set):
+    while backfill_status["state"] == "running":
+        start = scan.claim()
+        if start is None:
+            # Batches still in flight may reveal newer messages and extend the scan.
+            if scan.in_flight:
+                await sleep(0.5)
+                continue
+            return
+        end = start + BATCH_SIZE - 1
+        if scan.end_id:
+            end = min(end, scan.end_id)
+
+        # Keep the metadata stage, not this loop, as the bottleneck.
+        while metadata_queue.qsize() > Telegram.BACKFILL_MAX_PENDING:
+            await sleep(1)
+
+        messages = await _fetch(client, chat_id, start, end)
+        jobs = []
+        scanned = queued = skipped = unparseable = 0
+        for message in messages or []:
+            if not message or message.empty:
+                continue
+            scanned += 1
+            scan.last_seen = max(scan.last_seen, message.id)
+            if not _is_video(message):
+                continue
+            if message.id in indexed:
+                skipped += 1
+                continue
+            jobs.append(make_job(message, default_id=""))
+
+        # Names metadata() would reject are dropped here without touching the
+        # journal or the queue; the rest are already memoized for the workers.
+        for job, parsed in zip(jobs, parse_batch([job["filename"] for job in jobs])):
+            if parsed.skip:
+                unparseable += 1
+            elif await enqueue_job(job):
+                queued += 1
+            else:
+                skipped += 1
+            indexed.add(job["msg_id"])
+
+        _set_status(
+            scanned=backfill_status["scanned"] + scanned,
+            queued=backfill_status["queued"] + queued,
+            skipped=backfill_status["skipped"] + skipped,
+            unparseable=backfill_status["unparseable"] + unparseable
+        )
+        if scan.complete(start):
+            _set_status(checkpoint=scan.resume_point)
+            await db.set_state(f"backfill:{chat_id}", {
+                "last_msg_id": scan.resume_point,
+                "updated_on": datetime.utcnow()
+            })
+
+
+async def run_backfill(chat_id: int, start_id: Optional[int] = None, end_id: Optional[int] = None):
+    _set_status(
+        state="running", chat_id=chat_id, scanned=0, queued=0, skipped=0,
+        unparseable=0, flood_waits=0, error=None, started_on=datetime.utcnow()
+    )
+    try:
+        if start_id is None:
+            checkpoint = await db.get_state(f"backfill:{chat_id}") or {}
+            start_id = checkpoint.get("last_msg_id", 0) + 1
+        indexed = await db.indexed_message_ids(chat_id)
+        LOGGER.info(f"Backfill of {chat_id} from message {start_id}: {len(indexed)} file(s) already indexed")
+
+        scan = _Scan(start_id, end_id)
+        _set_status(checkpoint=scan.resume_point)
+        clients = list(multi_clients.values())[:Telegram.BACKFILL_CONCURRENCY or None]
+        await gather(*(_worker(client, chat_id, scan, indexed) for client in clients))
+
+        if backfill_status["state"] == "running":
+            _set_status(state="done")
+        LOGGER.info(
+            f"Backfill of {chat_id} finished: {backfill_status['queued']} queued, "
+            f"{backfill_status['skipped']} already indexed, {backfill_status['unparseable']} unparseable"
+        )
+    except Exception as e:
+        LOGGER.error(f"Backfill failed: {e}")
+        _set_status(state="error", error=str(e))
+
+
+def start_backfill(chat_id: int, start_id: Optional[int] = None, end_id: Optional[int] = None) -> bool:
+    global _backfill_task
+    if _backfill_task and not _backfill_task.done():
+        return False
+    _backfill_task = create_task(run_backfill(chat_id, start_id, end_id))
+    return True
+
+
+def stop_backfill() -> bool:
+    if backfill_status["state"] != "running":
+        return False
+    # Workers finish their current batch, so the checkpoint stays accurate.
+    _set_status(state="stopped")
+    return True
@@ -0,0 +1,127 @@
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+CATALOG_PROJECTION = {
+    "_id": 0, "tmdb_id": 1, "media_type": 1, "title": 1, "poster": 1, "logo": 1, "backdrop": 1,
+    "release_year": 1, "genres": 1, "rating": 1, "description": 1, "updated_on": 1
+}
+SORT_KEYS = ("updated_on", "rating")
+# Views are keyed by the genre from the request URL; keep only the most recent
+# ones so arbitrary genre strings cannot pile up sorted copies of the catalog.
+MAX_VIEWS = 64
+
+
+class CatalogItem:
+    __slots__ = (
+        "tmdb_id", "media_type", "title", "poster", "logo", "backdrop",
+        "release_year", "genres", "rating", "description", "updated_on"
+    )
+
+    def __init__(self, document: dict):
+        self.tmdb_id = int(document["tmdb_id"])
+        self.media_type = "tv" if str(document.get("media_type")).lower() in ("tv", "series") else "movie"
+        self.title = document.get("title")
+        self.poster = document.get("poster")
+        self.logo = document.get("logo")
+        self.backdrop = document.get("backdrop")
+        self.release_year = document.get("release_year")
+        self.genres = tuple(document.get("genres") or ())
+        self.rating = document.get("rating")
+        self.description = document.get("description")
+        self.updated_on = document.get("updated_on")
+
+    def to_dict(self) -> dict:
+        data = {slot: getattr(self, slot) for slot in self.__slots__}
+        data["genres"] = list(self.genres)
+        return data
+
+
+def _sort_value(item: CatalogItem, sort_key: str) -> tuple:
+    # Ascending order of this tuple is "descending by sort_key, missing values
+    # last", matching the Mongo sort it replaces; tmdb_id keeps ties stable.
+    value = getattr(item, sort_key)
+    if value is None:
+        return (1, 0, item.tmdb_id)
+    if isinstance(value, datetime):
+        value = value.timestamp()
+    return (0, -value, item.tmdb_id)
+
+
+class CatalogIndex:
+    """Summary of every title kept in memory with presorted browse views."""
+
+    def __init__(self):
+        self.items: Dict[Tuple[str, int], CatalogItem] = {}
+        self.views: "OrderedDict[Tuple[str, str, Optional[str]], List[CatalogItem]]" = OrderedDict()
+        self.generation = 0
+        self.loaded = False
+
+    def load(self, documents: Iterable[dict]):
+        self.items = {}
+        for document in documents:
+            item = CatalogItem(document)
+            self.items[(item.media_type, item.tmdb_id)] = item
+        self.views = OrderedDict()
+        self.generation += 1
+        self.loaded = True
+
+    def _matching_views(self, item: CatalogItem):
+        for (media_type, sort_key, genre), view in self.views.items():
+            if media_type == item.media_type and (genre is None or genre in item.genres):
+                yield sort_key, view
+
+    def _unlink(self, item: CatalogItem):
+        for sort_key, view in self._matching_views(item):
+            index = bisect_left(view, _sort_value(item, sort_key), key=lambda i: _sort_value(i, sort_key))
+            if index < len(view) and view[index] is item:
+                view.pop(index)
+
+    def upsert(self, document: dict):
+        item = CatalogItem(document)
+        key = (item.media_type, item.tmdb_id)
+        if key in self.items:
+            self._unlink(self.items[key])
+        self.items[key] = item
+        for sort_key, view in self._matching_views(item):
+            insort(view, item, key=lambda i: _sort_value(i, sort_key))
+        self.generation += 1
+
+    def remove(self, media_type: str, tmdb_id: int):
+        item = self.items.pop(("tv" if media_type.lower() in ("tv", "series") else "movie", int(tmdb_id)), None)
+        if item:
+            self._unlink(item)
+            self.generation += 1
+
+    def _view(self, media_type: str, sort_key: str, genre: Optional[str]) -> List[CatalogItem]:
+        key = (media_type, sort_key, genre)
+        view = self.views.get(key)
+        if view is None:
+            view = sorted(
+                (item for item in self.items.values()
+                 if item.media_type == media_type and (genre is None or genre in item.genres)),
+                key=lambda i: _sort_value(i, sort_key)
+            )
+            self.views[key] = view
+            if len(self.views) > MAX_VIEWS:
+                self.views.popitem(last=False)
+        else:
+            self.views.move_to_end(key)
+        return view
+
+    def page(
+        self, media_type: str, sort_key: str = "updated_on",
+        genre: Optional[str] = None, skip: int = 0, limit: int = 15
+    ) -> List[dict]:
+        if sort_key not in SORT_KEYS:
+            sort_key = "updated_on"
+        view = self._view(media_type, sort_key, genre)
+        return [item.to_dict() for item in view[skip:skip + limit]]
+
+    def count(self, media_type: str, genre: Optional[str] = None) -> int:
+        return len(self._view(media_type, "updated_on", genre))
+
+
+catalog = CatalogIndex()
@@ -1,9 +1,11 @@
 import asyncio
+from collections import OrderedDict
 from pyrogram import utils, raw
 from pyrogram.errors import AuthBytesInvalid
 from pyrogram.file_id import FileId, FileType, ThumbnailSource
 from pyrogram.session import Session, Auth
-from typing import Dict, Union
+from typing import Dict, Iterable, Optional, Tuple, Union
+from Backend.config import Telegram
 from Backend.logger import LOGGER
 from Backend.helper.exceptions import FIleNotFound
 from Backend.helper.pyro import get_file_ids
@@ -11,6 +13,67 @@ from Backend.pyrofork.bot import work_loads
 from pyrogram import Client, utils, raw
 
 
+class ChunkCache:
+    """Byte-bounded LRU of Telegram file chunks keyed by (media_id, offset).
+
+    Only the head and tail of a file are kept from regular streaming: that is
+    where players seek first (opening burst, container index), while the
+    middle of a file is rarely read twice.
+    """
+
+    def __init__(self, max_bytes: int, head_chunks: int = 2, tail_chunks: int = 1):
+        self.chunks: "OrderedDict[Tuple[int, int], bytes]" = OrderedDict()
+        self.max_bytes = max_bytes
+        self.head_chunks = head_chunks
+        self.tail_chunks = tail_chunks
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.prefetched = 0
+
+    def __contains__(self, key: Tuple[int, int]) -> bool:
+        return key in self.chunks
+
+    def get(self, media_id: int, offset: int) -> Optional[bytes]:
+        chunk = self.chunks.get((media_id, offset))
+        if chunk is None:
+            self.misses += 1
+            return None
+        self.chunks.move_to_end((media_id, offset))
+        self.hits += 1
+        return chunk
+
+    def put(self, media_id: int, offset: int, chunk: bytes):
+        if not self.max_bytes or len(chunk) > self.max_bytes:
+            return
+        key = (media_id, offset)
+        if key in self.chunks:
+            self.size -= len(self.chunks.pop(key))
+        self.chunks[key] = chunk
+        self.size += len(chunk)
+        while self.size > self.max_bytes:
+            _, evicted = self.chunks.popitem(last=False)
+            self.size -= len(evicted)
+
+    def should_keep(self, offset: int, file_size: int, chunk_size: int) -> bool:
+        return offset < self.head_chunks * chunk_size or offset >= file_size - self.tail_chunks * chunk_size
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.chunks),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "prefetched": self.prefetched,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+chunk_cache = ChunkCache(Telegram.CHUNK_CACHE_MB * 1024 * 1024)
+
+
 class ByteStreamer:
     def __init__(self, client: Client):
         self.clean_timer = 30 * 60
@@ -35,38 +98,61 @@ class ByteStreamer:
         current_part = 1
         location = await self.get_location(file_id)
         try:
-            r = await media_session.send(raw.functions.upload.GetFile(location=location, offset=offset, limit=chunk_size))
-            if isinstance(r, raw.types.upload.File):
-                while True:
-                    chunk = r.bytes
-                    if not chunk:
-                        break
-                    elif part_count == 1:
-                        yield chunk[first_part_cut:last_part_cut]
-                    elif current_part == 1:
-                        yield chunk[first_part_cut:]
-                    elif current_part == part_count:
-                        yield chunk[:last_part_cut]
-                    else:
-                        yield chunk
-
-                    current_part += 1
-                    offset += chunk_size
-
-                    if current_part > part_count:
-                        break
-                    
-                    r = await media_session.send(
-                        raw.functions.upload.GetFile(
-                            location=location, offset=offset, limit=chunk_size
-                        ),
-                    )
+            chunk = await self.get_chunk(media_session, location, file_id, offset, chunk_size)
+            while True:
+                if not chunk:
+                    break
+                elif part_count == 1:
+                    yield chunk[first_part_cut:last_part_cut]
+                elif current_part == 1:
+                    yield chunk[first_part_cut:]
+                elif current_part == part_count:
+                    yield chunk[:last_part_cut]
+                else:
+                    yield chunk
+
+                current_part += 1
+                offset += chunk_size
+
+                if current_part > part_count:
+                    break
+
+                chunk = await self.get_chunk(media_session, location, file_id, offset, chunk_size)
         except (TimeoutError, AttributeError):
             pass
         finally:
             LOGGER.debug("Finished yielding file with {current_part} parts.")
             work_loads[index] -= 1
 
+    async def get_chunk(self, media_session: Session, location, file_id: FileId, offset: int, chunk_size: int) -> bytes:
+        chunk = chunk_cache.get(file_id.media_id, offset)
+        if chunk is not None:
+            return chunk
+        r = await media_session.send(raw.functions.upload.GetFile(location=location, offset=offset, limit=chunk_size))
+        if not isinstance(r, raw.types.upload.File):
+            return b""
+        if r.bytes and chunk_cache.should_keep(offset, file_id.file_size, chunk_size):
+            chunk_cache.put(file_id.media_id, offset, r.bytes)
+        return r.bytes
+
+    async def prefetch(self, file_id: FileId, offsets: Iterable[int], chunk_size: int = 1024 * 1024) -> int:
+        """Pull chunks into the cache ahead of a request; returns how many were fetched."""
+        offsets = [offset for offset in offsets if (file_id.media_id, offset) not in chunk_cache]
+        if not offsets:
+            return 0
+        media_session = await self.generate_media_session(self.client, file_id)
+        if media_session is None:
+            return 0
+        location = await self.get_location(file_id)
+        fetched = 0
+        for offset in offsets:
+            r = await media_session.send(raw.functions.upload.GetFile(location=location, offset=offset, limit=chunk_size))
+            if isinstance(r, raw.types.upload.File) and r.bytes:
+                chunk_cache.put(file_id.media_id, offset, r.bytes)
+                fetched += 1
+        chunk_cache.prefetched += fetched
+        return fetched
+
     async def generate_media_session(self, client: Client, file_id: FileId) -> Session:
         media_session = client.media_sessions.get(file_id.dc_id, None)
         if media_session is None:
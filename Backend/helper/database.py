@@ -1,28 +1,30 @@
-from asyncio import create_task
-from bson import ObjectId
+from asyncio import gather, sleep
+from bson import ObjectId, encode as bson_encode
 import motor.motor_asyncio
 from datetime import datetime
 from pydantic import ValidationError
-from pymongo import ASCENDING, DESCENDING
+from pymongo import ASCENDING, DESCENDING, ReplaceOne, UpdateOne
 from typing import Dict, List, Optional, Tuple, Any
 
 from Backend.logger import LOGGER
 from Backend.config import Telegram
 import re
+from Backend.helper.catalog import CATALOG_PROJECTION, catalog
 from Backend.helper.encrypt import decode_string, encode_string
-from Backend.helper.modal import Episode, MovieSchema, QualityDetail, Season, TVShowSchema
-from Backend.helper.task_manager import delete_message
+from Backend.helper.locks import title_lock
+from Backend.helper.modal import SCHEMA_VERSION, Episode, MovieSchema, QualityDetail, Season, TVShowSchema
 
 
-def convert_objectid_to_str(document: Dict[str, Any]) -> Dict[str, Any]:
-    for key, value in document.items():
-        if isinstance(value, ObjectId):
-            document[key] = str(value)
-        elif isinstance(value, list):
-            document[key] = [convert_objectid_to_str(item) if isinstance(item, dict) else item for item in value]
-        elif isinstance(value, dict):
-            document[key] = convert_objectid_to_str(value)
-    return document
+QUALITY_REF_PROJECTION = {"telegram.quality": 1, "telegram.id": 1, "telegram.chat_id": 1, "telegram.msg_id": 1}
+
+SIZE_UNITS = {"B": 1, "KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3, "TB": 1024 ** 4, "PB": 1024 ** 5}
+
+
+def parse_file_size(size: Optional[str]) -> Optional[int]:
+    match = re.fullmatch(r"\s*([\d.]+)\s*([KMGTP]?B)\s*", str(size or ""), re.IGNORECASE)
+    if not match:
+        return None
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2).upper()])
 
 
 class Database:
@@ -37,6 +39,10 @@ class Database:
         self.dbs: Dict[str, motor.motor_asyncio.AsyncIOMotorDatabase] = {}
 
         self.current_db_index = 1
+        self.routes: Dict[Tuple[str, int], int] = {}
+        self.capacity: Dict[int, Dict[str, Any]] = {}
+        self.stats_cache: Dict[str, Any] = {"databases": [], "deletion_queue": {}, "updated_on": None}
+        self.split_episodes = Telegram.SPLIT_EPISODES
 
     async def connect(self):
         try:
@@ -60,6 +66,15 @@ class Database:
                 self.current_db_index = state["current_index"]
 
             LOGGER.info(f"Active storage DB: storage_{self.current_db_index}")
+            await self.sync_routes()
+            await self.load_catalog()
+            await self._ensure_episode_indexes()
+            await self.dbs["tracking"]["delete_queue"].create_index(
+                [("chat_id", ASCENDING), ("msg_id", ASCENDING)], unique=True
+            )
+            await self.dbs["tracking"]["delete_queue"].create_index([("queued_on", ASCENDING)])
+            await self.dbs["tracking"]["metadata_cache"].create_index([("expires_at", ASCENDING)], expireAfterSeconds=0)
+            await self.dbs["tracking"]["ingest_index"].create_index([("chat_id", ASCENDING), ("msg_id", ASCENDING)])
 
         except Exception as e:
             LOGGER.error(f"Database connection error: {e}")
@@ -77,6 +92,357 @@ class Database:
         )
 
 
+    # -------------------------------
+    # Routing Directory (media_type, tmdb_id) -> storage index
+    # -------------------------------
+    @staticmethod
+    def _collection_name(media_type: str) -> str:
+        return "tv" if media_type.lower() in ["tv", "series"] else "movie"
+
+    async def sync_routes(self):
+        routes = self.dbs["tracking"]["routes"]
+        state = await self.dbs["tracking"]["state"].find_one({"_id": "routes"})
+        if state and state.get("synced"):
+            return
+
+        LOGGER.info("Building storage routing directory...")
+        await routes.create_index([("media_type", ASCENDING), ("tmdb_id", ASCENDING)], unique=True)
+        total = 0
+        for db_index in range(1, len(self.dbs)):
+            db = self.dbs[f"storage_{db_index}"]
+            for collection_name in ["movie", "tv"]:
+                ops = []
+                async for doc in db[collection_name].find({}, {"tmdb_id": 1}):
+                    ops.append(UpdateOne(
+                        {"_id": f"{collection_name}:{doc['tmdb_id']}"},
+                        {"$set": {"media_type": collection_name, "tmdb_id": doc["tmdb_id"], "db_index": db_index}},
+                        upsert=True
+                    ))
+                if ops:
+                    await routes.bulk_write(ops, ordered=False)
+                    total += len(ops)
+        await self.dbs["tracking"]["state"].update_one(
+            {"_id": "routes"}, {"$set": {"synced": True}}, upsert=True
+        )
+        LOGGER.info(f"Routing directory ready with {total} entries.")
+
+    async def get_route(self, media_type: str, tmdb_id: int) -> Optional[int]:
+        key = (self._collection_name(media_type), int(tmdb_id))
+        if key in self.routes:
+            return self.routes[key]
+        route = await self.dbs["tracking"]["routes"].find_one({"_id": f"{key[0]}:{key[1]}"})
+        if not route:
+            return None
+        self.routes[key] = route["db_index"]
+        return route["db_index"]
+
+    async def set_route(self, media_type: str, tmdb_id: int, db_index: int):
+        collection_name = self._collection_name(media_type)
+        await self.dbs["tracking"]["routes"].update_one(
+            {"_id": f"{collection_name}:{int(tmdb_id)}"},
+            {"$set": {"media_type": collection_name, "tmdb_id": int(tmdb_id), "db_index": db_index}},
+            upsert=True
+        )
+        self.routes[(collection_name, int(tmdb_id))] = db_index
+
+    async def drop_route(self, media_type: str, tmdb_id: int):
+        collection_name = self._collection_name(media_type)
+        await self.dbs["tracking"]["routes"].delete_one({"_id": f"{collection_name}:{int(tmdb_id)}"})
+        self.routes.pop((collection_name, int(tmdb_id)), None)
+
+    async def resolve_db_index(self, media_type: str, tmdb_id: int, hint: Optional[int] = None) -> Optional[int]:
+        collection_name = self._collection_name(media_type)
+        db_index = await self.get_route(collection_name, tmdb_id)
+        if db_index:
+            return db_index
+
+        # Missing route: check the caller's hint first, then probe every storage DB once.
+        candidates = list(range(1, len(self.dbs)))
+        if hint in candidates:
+            candidates.remove(hint)
+            candidates.insert(0, hint)
+        for index in candidates:
+            if await self.dbs[f"storage_{index}"][collection_name].find_one({"tmdb_id": int(tmdb_id)}, {"_id": 1}):
+                await self.set_route(collection_name, tmdb_id, index)
+                return index
+        return None
+
+    async def _find_existing(
+        self, collection_name: str, tmdb_id: int, title: str, release_year: Optional[int],
+        projection: Optional[dict] = None
+    ):
+        match = {"title": title, "release_year": release_year}
+        routed_index = await self.get_route(collection_name, tmdb_id)
+        if routed_index:
+            # IMDb-derived ids share the numeric range of TMDb ids, so a route
+            # hit is only trusted when the title/year agree as well.
+            db = self.dbs[f"storage_{routed_index}"][collection_name]
+            doc = await db.find_one(match, projection)
+            if doc:
+                return routed_index, doc
+            if not await db.find_one({"tmdb_id": tmdb_id}, {"_id": 1}):
+                await self.drop_route(collection_name, tmdb_id)
+                routed_index = None
+
+        # Unknown tmdb_id: fall back to matching on title/year, which also catches
+        # the same title ingested earlier under its IMDb-derived id.
+        for db_index in range(1, len(self.dbs)):
+            doc = await self.dbs[f"storage_{db_index}"][collection_name].find_one(match, projection)
+            if doc:
+                await self.set_route(collection_name, doc["tmdb_id"], db_index)
+                # Route the id that was looked up too, unless it belongs to another title.
+                if not routed_index and int(doc["tmdb_id"]) != int(tmdb_id):
+                    await self.set_route(collection_name, tmdb_id, db_index)
+                return db_index, doc
+        return None, None
+
+
+    # -------------------------------
+    # Split Episode Layout (episodes live in their own collection)
+    # -------------------------------
+    async def _ensure_episode_indexes(self):
+        for db_index in range(1, len(self.dbs)):
+            await self.dbs[f"storage_{db_index}"]["episodes"].create_index(
+                [("tmdb_id", ASCENDING), ("season_number", ASCENDING), ("episode_number", ASCENDING)],
+                unique=True
+            )
+
+    async def _load_split_seasons(
+        self, db_key: str, tmdb_id: int,
+        season_number: Optional[int] = None, include_files: bool = True
+    ) -> List[dict]:
+        query = {"tmdb_id": tmdb_id}
+        if season_number is not None:
+            query["season_number"] = season_number
+        projection = {"_id": 0, "tmdb_id": 0}
+        if not include_files:
+            projection["telegram"] = 0
+
+        seasons: Dict[int, dict] = {}
+        cursor = self.dbs[db_key]["episodes"].find(query, projection).sort(
+            [("season_number", ASCENDING), ("episode_number", ASCENDING)]
+        )
+        async for episode in cursor:
+            number = episode.pop("season_number")
+            seasons.setdefault(number, {"season_number": number, "episodes": []})["episodes"].append(episode)
+        return list(seasons.values())
+
+    async def _write_split_episodes(self, db_key: str, tmdb_id: int, seasons: List[dict]):
+        collection = self.dbs[db_key]["episodes"]
+        keys = [
+            {"season_number": season["season_number"], "episode_number": episode["episode_number"]}
+            for season in seasons for episode in season["episodes"]
+        ]
+        if not keys:
+            return
+
+        existing = {}
+        cursor = collection.find(
+            {"tmdb_id": tmdb_id, "$or": keys},
+            {"season_number": 1, "episode_number": 1, **QUALITY_REF_PROJECTION}
+        )
+        async for doc in cursor:
+            existing[(doc["season_number"], doc["episode_number"])] = doc
+
+        operations = []
+        for season in seasons:
+            for episode in season["episodes"]:
+                key = {
+                    "tmdb_id": tmdb_id,
+                    "season_number": season["season_number"],
+                    "episode_number": episode["episode_number"]
+                }
+                qualities = episode.get("telegram") or []
+                existing_episode = existing.get((key["season_number"], key["episode_number"]))
+                if not existing_episode:
+                    operations.append(UpdateOne(
+                        key,
+                        {
+                            "$setOnInsert": {"title": episode["title"], "episode_backdrop": episode.get("episode_backdrop")},
+                            "$push": {"telegram": {"$each": qualities}}
+                        },
+                        upsert=True
+                    ))
+                    continue
+
+                for quality in qualities:
+                    target_quality = quality.get("quality")
+                    existing_quality = next(
+                        (q for q in existing_episode.get("telegram") or [] if q.get("quality") == target_quality), None
+                    )
+                    if existing_quality:
+                        await self._queue_file_deletion(existing_quality)
+                        operations.append(UpdateOne(
+                            key, {"$set": {"telegram.$[q]": quality}}, array_filters=[{"q.quality": target_quality}]
+                        ))
+                    else:
+                        operations.append(UpdateOne(
+                            {**key, "telegram.quality": {"$ne": target_quality}}, {"$push": {"telegram": quality}}
+                        ))
+        if operations:
+            await collection.bulk_write(operations)
+
+    async def _copy_episodes(self, old_db_key: str, new_db_key: str, tmdb_id: int):
+        episodes = await self.dbs[old_db_key]["episodes"].find({"tmdb_id": tmdb_id}).to_list(None)
+        if episodes:
+            await self.dbs[new_db_key]["episodes"].insert_many(episodes)
+
+    async def migrate_episode_layout(self) -> Dict[str, int]:
+        shows, episodes = 0, 0
+        for db_index in range(1, len(self.dbs)):
+            db = self.dbs[f"storage_{db_index}"]
+            pending = db["tv"].find({"episode_layout": {"$ne": "split"}}, {"tmdb_id": 1})
+            async for ref in pending:
+                # Ingest and the rebalancer write under the same lock, so no
+                # episode can land in the embedded layout between copy and flip.
+                async with title_lock(("tv", int(ref["tmdb_id"]))):
+                    tv = await db["tv"].find_one(
+                        {"_id": ref["_id"], "episode_layout": {"$ne": "split"}}, {"tmdb_id": 1, "seasons": 1}
+                    )
+                    if not tv:
+                        continue
+                    operations = []
+                    for season in tv.get("seasons", []):
+                        for episode in season.get("episodes", []):
+                            key = {
+                                "tmdb_id": tv["tmdb_id"],
+                                "season_number": season["season_number"],
+                                "episode_number": episode["episode_number"]
+                            }
+                            operations.append(ReplaceOne(key, {**episode, **key}, upsert=True))
+                    if operations:
+                        await db["episodes"].bulk_write(operations, ordered=False)
+                    await db["tv"].update_one(
+                        {"_id": tv["_id"]}, {"$set": {"seasons": [], "episode_layout": "split"}}
+                    )
+                shows += 1
+                episodes += len(operations)
+            LOGGER.info(f"Episode layout migration: storage_{db_index} done ({shows} shows so far)")
+        return {"shows": shows, "episodes": episodes}
+
+
+    # -------------------------------
+    # Telegram Reference Schema v2 (typed chat/message fields)
+    # -------------------------------
+    async def _quality_v2_fields(self, quality: dict) -> Dict[str, Any]:
+        fields = {}
+        if not quality.get("msg_id") and quality.get("id"):
+            try:
+                decoded_data = await decode_string(quality["id"])
+                fields["chat_id"] = int(f"-100{decoded_data['chat_id']}")
+                fields["msg_id"] = int(decoded_data["msg_id"])
+            except Exception as e:
+                LOGGER.error(f"Failed to decode file id during schema migration: {e}")
+        if quality.get("size_bytes") is None:
+            size_bytes = parse_file_size(quality.get("size"))
+            if size_bytes is not None:
+                fields["size_bytes"] = size_bytes
+        return fields
+
+    async def _upgrade_quality_operations(self, document: dict, path: str, qualities: List[dict]) -> List[UpdateOne]:
+        # Each entry is matched by its encoded id, so a quality replaced while the
+        # migration runs is simply left alone instead of being overwritten.
+        operations = []
+        for quality in qualities:
+            fields = await self._quality_v2_fields(quality)
+            if fields and quality.get("id"):
+                operations.append(UpdateOne(
+                    {"_id": document["_id"]},
+                    {"$set": {f"{path}.{key}": value for key, value in fields.items()}},
+                    array_filters=[{"q.id": quality["id"]}]
+                ))
+        return operations
+
+    async def migrate_quality_schema(self, batch_size: int = 100) -> Dict[str, int]:
+        state = await self.dbs["tracking"]["state"].find_one({"_id": "schema_version"})
+        if state and state.get("version", 1) >= SCHEMA_VERSION:
+            return {"documents": 0}
+
+        LOGGER.info(f"Upgrading stored Telegram references to schema v{SCHEMA_VERSION}...")
+        upgraded = 0
+        for db_index in range(1, len(self.dbs)):
+            db = self.dbs[f"storage_{db_index}"]
+            sources = (
+                ("movie", {"schema_version": {"$ne": SCHEMA_VERSION}}),
+                ("tv", {"schema_version": {"$ne": SCHEMA_VERSION}}),
+                ("episodes", {"telegram": {"$elemMatch": {"$or": [
+                    {"msg_id": {"$exists": False}}, {"size_bytes": {"$exists": False}}
+                ]}}}),
+            )
+            for collection_name, query in sources:
+                operations = []
+                async for document in db[collection_name].find(query, {"telegram": 1, "seasons": 1}):
+                    if collection_name == "tv":
+                        for season in document.get("seasons", []):
+                            for episode in season.get("episodes", []):
+                                operations += await self._upgrade_quality_operations(
+                                    document, "seasons.$[].episodes.$[].telegram.$[q]", episode.get("telegram") or []
+                                )
+                    else:
+                        operations += await self._upgrade_quality_operations(
+                            document, "telegram.$[q]", document.get("telegram") or []
+                        )
+                    if collection_name != "episodes":
+                        operations.append(UpdateOne(
+                            {"_id": document["_id"]}, {"$set": {"schema_version": SCHEMA_VERSION}}
+                        ))
+                    upgraded += 1
+                    if len(operations) >= batch_size:
+                        await db[collection_name].bulk_write(operations, ordered=False)
+                        operations = []
+                        await sleep(0.1)
+                if operations:
+                    await db[collection_name].bulk_write(operations, ordered=False)
+            LOGGER.info(f"Schema v{SCHEMA_VERSION} migration: storage_{db_index} done ({upgraded} documents so far)")
+
+        await self.dbs["tracking"]["state"].update_one(
+            {"_id": "schema_version"}, {"$set": {"version": SCHEMA_VERSION}}, upsert=True
+        )
+        return {"documents": upgraded}
+
+
+    # -------------------------------
+    # Telegram Message Deletion Queue
+    # -------------------------------
+    async def queue_message_deletions(self, refs: List[Tuple[int, int]]):
+        if not refs:
+            return
+        operations = [
+            UpdateOne(
+                {"chat_id": chat_id, "msg_id": msg_id},
+                {"$setOnInsert": {"queued_on": datetime.utcnow(), "attempts": 0}},
+                upsert=True
+            )
+            for chat_id, msg_id in refs
+        ]
+        await self.dbs["tracking"]["delete_queue"].bulk_write(operations, ordered=False)
+
+    async def next_deletion_batch(self, limit: int = 100, max_attempts: int = 5) -> Tuple[Optional[int], List[int]]:
+        queue = self.dbs["tracking"]["delete_queue"]
+        oldest = await queue.find_one({"attempts": {"$lt": max_attempts}}, sort=[("queued_on", ASCENDING)])
+        if not oldest:
+            return None, []
+        cursor = queue.find(
+            {"chat_id": oldest["chat_id"], "attempts": {"$lt": max_attempts}}, {"msg_id": 1}
+        ).sort("queued_on", ASCENDING).limit(limit)
+        return oldest["chat_id"], [doc["msg_id"] async for doc in cursor]
+
+    async def ack_deletions(self, chat_id: int, msg_ids: List[int]):
+        await self.dbs["tracking"]["delete_queue"].delete_many({"chat_id": chat_id, "msg_id": {"$in": msg_ids}})
+
+    async def fail_deletions(self, chat_id: int, msg_ids: List[int]):
+        await self.dbs["tracking"]["delete_queue"].update_many(
+            {"chat_id": chat_id, "msg_id": {"$in": msg_ids}}, {"$inc": {"attempts": 1}}
+        )
+
+    async def get_deletion_queue_stats(self) -> Dict[str, int]:
+        queue = self.dbs["tracking"]["delete_queue"]
+        return {
+            "pending": await queue.count_documents({"attempts": {"$lt": 5}}),
+            "failed": await queue.count_documents({"attempts": {"$gte": 5}}),
+        }
+
+
     # -------------------------------
     # Helper Methods for Repeated Logic
     # -------------------------------
@@ -101,7 +467,7 @@ class Database:
         total_count = 0
 
         db_counts = []
-        for i in range(1, self.current_db_index + 1):
+        for i in range(1, len(self.dbs)):
             db_key = f"storage_{i}"
             db = self.dbs[db_key]
             count = await db[collection_name].count_documents(filter_dict)
@@ -142,20 +508,40 @@ class Database:
         return results, dbs_checked, total_count
 
     async def _move_document(
-        self, collection_name: str, document: dict, old_db_index: int
+        self, collection_name: str, document: dict, old_db_index: int, new_db_index: Optional[int] = None
     ) -> bool:
-        current_db_key = f"storage_{self.current_db_index}"
+        new_db_index = new_db_index or self.current_db_index
+        new_db_key = f"storage_{new_db_index}"
         old_db_key = f"storage_{old_db_index}"
-        document["db_index"] = self.current_db_index
+        document["db_index"] = new_db_index
+        split = document.get("episode_layout") == "split"
         try:
-            await self.dbs[current_db_key][collection_name].insert_one(document)
-            await self.dbs[old_db_key][collection_name].delete_one({"_id": document["_id"]})
-            LOGGER.info(f"✅ Moved document {document.get('tmdb_id')} from {old_db_key} to {current_db_key}")
-            return True
+            # Both copies are written before anything is removed from the old
+            # DB, so a failed write (usually a full destination) loses nothing.
+            if split:
+                await self._copy_episodes(old_db_key, new_db_key, document["tmdb_id"])
+            await self.dbs[new_db_key][collection_name].insert_one(document)
         except Exception as e:
-            LOGGER.error(f"Error moving document to {current_db_key}: {e}")
+            LOGGER.error(f"Error moving document to {new_db_key}: {e}")
+            try:
+                if split:
+                    await self.dbs[new_db_key]["episodes"].delete_many({"tmdb_id": document["tmdb_id"]})
+                await self.dbs[new_db_key][collection_name].delete_one({"_id": document["_id"]})
+            except Exception as cleanup_error:
+                LOGGER.error(f"Cleanup of partial copy in {new_db_key} failed: {cleanup_error}")
             return False
 
+        try:
+            # Point readers at the new copy before the old one disappears.
+            await self.set_route(collection_name, document["tmdb_id"], new_db_index)
+            await self.dbs[old_db_key][collection_name].delete_one({"_id": document["_id"]})
+            if split:
+                await self.dbs[old_db_key]["episodes"].delete_many({"tmdb_id": document["tmdb_id"]})
+        except Exception as e:
+            LOGGER.error(f"Failed to remove moved document {document.get('tmdb_id')} from {old_db_key}: {e}")
+        LOGGER.info(f"✅ Moved document {document.get('tmdb_id')} from {old_db_key} to {new_db_key}")
+        return True
+
     async def _handle_storage_error(self, func, *args, total_storage_dbs: int) -> Optional[Any]:
         next_db_index = (self.current_db_index % total_storage_dbs) + 1
         if next_db_index == 1:
@@ -167,67 +553,377 @@ class Database:
         return await func(*args)
 
 
+    # -------------------------------
+    # Storage Capacity & Stats Monitor
+    # -------------------------------
+    def _storage_quota(self, db_index: int) -> int:
+        quotas = Telegram.DATABASE_QUOTA_MB
+        quota_mb = quotas[db_index - 1] if db_index <= len(quotas) else quotas[-1]
+        return quota_mb * 1024 * 1024
+
+    async def _sample_db(self, db_index: int) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        db_key = f"storage_{db_index}"
+        db = self.dbs[db_key]
+        movie_count, tv_count, db_stats = await gather(
+            db["movie"].estimated_document_count(),
+            db["tv"].estimated_document_count(),
+            db.command("dbstats")
+        )
+        used = db_stats.get("dataSize", 0) + db_stats.get("indexSize", 0)
+        quota = self._storage_quota(db_index)
+        stats = {
+            "db_name": db_key,
+            "movie_count": movie_count,
+            "tv_count": tv_count,
+            "storageSize": db_stats.get("storageSize", 0),
+            "dataSize": db_stats.get("dataSize", 0),
+            "quota": quota
+        }
+        capacity = {
+            "dataSize": db_stats.get("dataSize", 0),
+            "indexSize": db_stats.get("indexSize", 0),
+            "storageSize": db_stats.get("storageSize", 0),
+            "used": used,
+            "quota": quota,
+            "ratio": used / quota if quota else 0,
+            "sampled_on": datetime.utcnow()
+        }
+        return stats, capacity
+
+    def _has_room(self, db_index: int) -> bool:
+        sample = self.capacity.get(db_index)
+        return sample is None or sample["ratio"] < Telegram.DB_ROLLOVER_RATIO
+
+    def _mark_full(self, db_index: int):
+        sample = self.capacity.get(db_index, {})
+        self.capacity[db_index] = {**sample, "ratio": 1.0, "sampled_on": datetime.utcnow()}
+
+    async def _select_write_db(self):
+        candidates = [db_index for db_index in range(1, len(self.dbs)) if self._has_room(db_index)]
+        if not candidates:
+            LOGGER.warning("⚠️ All storage databases are above the rollover threshold! Add more.")
+            return
+
+        if Telegram.WRITE_STRATEGY == "least_full":
+            target = min(candidates, key=lambda db_index: self.capacity.get(db_index, {}).get("ratio", 0))
+        elif self._has_room(self.current_db_index):
+            return
+        else:
+            target = next((db_index for db_index in candidates if db_index > self.current_db_index), candidates[0])
+
+        if target != self.current_db_index:
+            LOGGER.info(f"Rolling writes over from storage_{self.current_db_index} to storage_{target}")
+            self.current_db_index = target
+            await self.update_current_db_index()
+
+    async def refresh_stats(self) -> Dict[str, Any]:
+        indexes = list(range(1, len(self.dbs)))
+        samples = await gather(*(self._sample_db(db_index) for db_index in indexes), return_exceptions=True)
+        previous = {stat["db_name"]: stat for stat in self.stats_cache["databases"]}
+        databases = []
+        for db_index, sample in zip(indexes, samples):
+            if isinstance(sample, Exception):
+                LOGGER.error(f"Failed to sample storage_{db_index}: {sample}")
+                if f"storage_{db_index}" in previous:
+                    databases.append(previous[f"storage_{db_index}"])
+                continue
+            stats, self.capacity[db_index] = sample
+            databases.append(stats)
+        try:
+            deletion_queue = await self.get_deletion_queue_stats()
+        except Exception as e:
+            LOGGER.error(f"Failed to count the deletion queue: {e}")
+            deletion_queue = self.stats_cache["deletion_queue"]
+        self.stats_cache = {"databases": databases, "deletion_queue": deletion_queue, "updated_on": datetime.utcnow()}
+        await self._select_write_db()
+        return self.stats_cache
+
+    async def stats_monitor(self):
+        while True:
+            try:
+                await self.refresh_stats()
+            except Exception as e:
+                LOGGER.error(f"Stats monitor error: {e}")
+            await sleep(Telegram.STATS_REFRESH_INTERVAL)
+
+
+    # -------------------------------
+    # In-memory Catalog Index
+    # -------------------------------
+    async def load_catalog(self):
+        documents = []
+        for db_index in range(1, len(self.dbs)):
+            for collection_name in ("movie", "tv"):
+                cursor = self.dbs[f"storage_{db_index}"][collection_name].find({}, CATALOG_PROJECTION)
+                async for document in cursor:
+                    document["media_type"] = collection_name
+                    documents.append(document)
+        catalog.load(documents)
+        LOGGER.info(f"Catalog index loaded: {len(catalog.items)} titles")
+
+    async def _sync_catalog(self, media_type: str, tmdb_id: int):
+        # Re-read the summary from the routed DB after a write so browse views
+        # never drift from what is stored.
+        if not catalog.loaded:
+            return
+        collection_name = self._collection_name(media_type)
+        db_index = await self.get_route(collection_name, tmdb_id)
+        document = None
+        if db_index:
+            document = await self.dbs[f"storage_{db_index}"][collection_name].find_one(
+                {"tmdb_id": int(tmdb_id)}, CATALOG_PROJECTION
+            )
+        if document:
+            catalog.upsert({**document, "media_type": collection_name})
+        else:
+            catalog.remove(collection_name, tmdb_id)
+
+
+    # -------------------------------
+    # State & Rebalancing Helpers
+    # -------------------------------
+    async def get_state(self, name: str) -> Optional[dict]:
+        return await self.dbs["tracking"]["state"].find_one({"_id": name})
+
+    async def set_state(self, name: str, fields: Dict[str, Any]):
+        await self.dbs["tracking"]["state"].update_one({"_id": name}, {"$set": fields}, upsert=True)
+
+    async def list_document_refs(
+        self, db_index: int, collection_name: str, after_id: Optional[ObjectId] = None, limit: int = 20
+    ) -> List[dict]:
+        query = {"_id": {"$gt": after_id}} if after_id else {}
+        cursor = self.dbs[f"storage_{db_index}"][collection_name].find(query, {"tmdb_id": 1})
+        return await cursor.sort("_id", ASCENDING).limit(limit).to_list(None)
+
+    async def relocate_document(
+        self, collection_name: str, document_id: ObjectId, old_db_index: int, new_db_index: int
+    ) -> int:
+        """Move one title between storage DBs and return the approximate bytes moved."""
+        document = await self.dbs[f"storage_{old_db_index}"][collection_name].find_one({"_id": document_id})
+        if not document:
+            return 0
+        size = len(bson_encode(document))
+        if not await self._move_document(collection_name, document, old_db_index, new_db_index):
+            return 0
+        # Keep the capacity view roughly current between dbstats samples.
+        for db_index, delta in ((old_db_index, -size), (new_db_index, size)):
+            sample = self.capacity.get(db_index)
+            if sample and sample["quota"]:
+                sample["used"] = max(sample["used"] + delta, 0)
+                sample["ratio"] = sample["used"] / sample["quota"]
+        return size
+
+
+    # -------------------------------
+    # Popularity Counters
+    # -------------------------------
+    async def save_popularity(self, documents: List[dict]):
+        operations = [
+            ReplaceOne({"_id": document["_id"]}, document, upsert=True) for document in documents
+        ]
+        if operations:
+            await self.dbs["tracking"]["popularity"].bulk_write(operations, ordered=False)
+
+    async def load_popularity(self, min_score: float = 0.01) -> List[dict]:
+        # Scores are stored as of "updated"; anything this small has long since
+        # decayed to nothing and is not worth bringing back.
+        cursor = self.dbs["tracking"]["popularity"].find({"score": {"$gte": min_score}})
+        return await cursor.to_list(None)
+
+
+    # -------------------------------
+    # Indexed Files
+    # -------------------------------
+    async def indexed_message_ids(self, chat_id: int) -> set:
+        """Message ids of one channel that are already referenced by a quality entry."""
+        ids = set()
+
+        def collect(qualities):
+            for quality in qualities or []:
+                if quality.get("chat_id") == chat_id and quality.get("msg_id"):
+                    ids.add(quality["msg_id"])
+
+        for db_index in range(1, len(self.dbs)):
+            storage = self.dbs[f"storage_{db_index}"]
+            for collection_name in ("movie", "episodes"):
+                cursor = storage[collection_name].find(
+                    {"telegram.chat_id": chat_id}, {"telegram.chat_id": 1, "telegram.msg_id": 1}
+                )
+                async for document in cursor:
+                    collect(document.get("telegram"))
+            cursor = storage["tv"].find(
+                {"seasons.episodes.telegram.chat_id": chat_id},
+                {"seasons.episodes.telegram.chat_id": 1, "seasons.episodes.telegram.msg_id": 1}
+            )
+            async for document in cursor:
+                for season in document.get("seasons", []):
+                    for episode in season.get("episodes", []):
+                        collect(episode.get("telegram"))
+        return ids
+
+
+    async def get_ingest_entry(self, file_unique_id: str) -> Optional[dict]:
+        document = await self.dbs["tracking"]["ingest_index"].find_one({"_id": file_unique_id})
+        if document:
+            document["signatures"] = set(document.get("signatures", []))
+        return document
+
+    async def record_ingest_entries(self, entries: List[dict]):
+        operations = [
+            UpdateOne(
+                {"_id": entry["_id"]},
+                {
+                    "$set": {"chat_id": entry["chat_id"], "msg_id": entry["msg_id"], "indexed_on": datetime.utcnow()},
+                    "$addToSet": {"signatures": {"$each": sorted(entry["signatures"])}}
+                },
+                upsert=True
+            )
+            for entry in entries
+        ]
+        if operations:
+            await self.dbs["tracking"]["ingest_index"].bulk_write(operations, ordered=False)
+
+
+    # -------------------------------
+    # Metadata Cache
+    # -------------------------------
+    async def get_cached_metadata(self, key: str) -> Optional[dict]:
+        # The TTL monitor only runs once a minute, so check expiry here too.
+        return await self.dbs["tracking"]["metadata_cache"].find_one(
+            {"_id": key, "expires_at": {"$gt": datetime.utcnow()}}
+        )
+
+    async def set_cached_metadata(self, key: str, value: Any, expires_at: datetime):
+        await self.dbs["tracking"]["metadata_cache"].update_one(
+            {"_id": key}, {"$set": {"value": value, "expires_at": expires_at}}, upsert=True
+        )
+
+
     # -------------------------------
     # Multi Database Method for insert/update/delete/list
     # -------------------------------
 
-    async def insert_media(
-        self, metadata_info: dict,
-        channel: int, msg_id: int, size: str, name: str
-    ) -> Optional[ObjectId]:
-        
+    def _build_media(
+        self, metadata_info: dict, channel: int, msg_id: int,
+        size: str, name: str, file_info: Optional[dict] = None
+    ):
+        file_info = file_info or {}
+        quality = QualityDetail(
+            quality=metadata_info['quality'],
+            id=metadata_info['encoded_string'],
+            name=name,
+            size=size,
+            chat_id=int(f"-100{channel}"),
+            msg_id=msg_id,
+            file_unique_id=file_info.get("file_unique_id"),
+            size_bytes=file_info.get("size_bytes"),
+            mime_type=file_info.get("mime_type")
+        )
+        common = dict(
+            tmdb_id=metadata_info['tmdb_id'],
+            imdb_id=metadata_info['imdb_id'],
+            db_index=self.current_db_index,
+            title=metadata_info['title'],
+            genres=metadata_info['genres'],
+            description=metadata_info['description'],
+            rating=metadata_info['rate'],
+            release_year=metadata_info['year'],
+            poster=metadata_info['poster'],
+            backdrop=metadata_info['backdrop'],
+            logo=metadata_info['logo'],
+            media_type=metadata_info['media_type'],
+        )
         if metadata_info['media_type'] == "movie":
-            media = MovieSchema(
-                tmdb_id=metadata_info['tmdb_id'],
-                imdb_id=metadata_info['imdb_id'],
-                db_index=self.current_db_index,
-                title=metadata_info['title'],
-                genres=metadata_info['genres'],
-                description=metadata_info['description'],
-                rating=metadata_info['rate'],
-                release_year=metadata_info['year'],
-                poster=metadata_info['poster'],
-                backdrop=metadata_info['backdrop'],
-                logo=metadata_info['logo'],
-                media_type=metadata_info['media_type'],
-                telegram=[QualityDetail(
-                    quality=metadata_info['quality'],
-                    id=metadata_info['encoded_string'],
-                    name=name,
-                    size=size
+            return MovieSchema(**common, telegram=[quality])
+        return TVShowSchema(
+            **common,
+            seasons=[Season(
+                season_number=metadata_info['season_number'],
+                episodes=[Episode(
+                    episode_number=metadata_info['episode_number'],
+                    title=metadata_info['episode_title'],
+                    episode_backdrop=metadata_info['episode_backdrop'],
+                    telegram=[quality]
                 )]
+            )]
+        )
+
+    async def _queue_file_deletion(self, quality: Optional[dict]):
+        await self._queue_file_deletions([quality])
+
+    async def _queue_file_deletions(self, qualities: List[Optional[dict]]):
+        refs = []
+        for quality in qualities:
+            if not quality:
+                continue
+            if quality.get("chat_id") and quality.get("msg_id"):
+                refs.append((quality["chat_id"], quality["msg_id"]))
+                continue
+            # Pre-v2 entries only carry the encoded id.
+            if not quality.get("id"):
+                continue
+            try:
+                decoded_data = await decode_string(quality["id"])
+                refs.append((int(f"-100{decoded_data['chat_id']}"), int(decoded_data['msg_id'])))
+            except Exception as e:
+                LOGGER.error(f"Failed to queue file for deletion: {e}")
+        await self.queue_message_deletions(refs)
+        if refs:
+            # A removed file may be uploaded again later; forget it.
+            await self.dbs["tracking"]["ingest_index"].delete_many(
+                {"$or": [{"chat_id": chat_id, "msg_id": msg_id} for chat_id, msg_id in refs]}
             )
+
+    async def _merge_qualities(self, qualities: List[QualityDetail], incoming: List[QualityDetail]):
+        for quality in incoming:
+            index = next((i for i, q in enumerate(qualities) if q.quality == quality.quality), None)
+            if index is None:
+                qualities.append(quality)
+            else:
+                await self._queue_file_deletion(qualities[index].dict())
+                qualities[index] = quality
+
+    async def _merge_seasons(self, seasons: List[Season], incoming: List[Season]):
+        for season in incoming:
+            existing_season = next((s for s in seasons if s.season_number == season.season_number), None)
+            if not existing_season:
+                seasons.append(season)
+                continue
+            for episode in season.episodes:
+                existing_episode = next(
+                    (e for e in existing_season.episodes if e.episode_number == episode.episode_number), None
+                )
+                if not existing_episode:
+                    existing_season.episodes.append(episode)
+                    continue
+                existing_episode.telegram = existing_episode.telegram or []
+                await self._merge_qualities(existing_episode.telegram, episode.telegram or [])
+
+    async def insert_media(
+        self, metadata_info: dict,
+        channel: int, msg_id: int, size: str, name: str, file_info: Optional[dict] = None
+    ) -> Optional[ObjectId]:
+        return await self.insert_media_group([(metadata_info, channel, msg_id, size, name, file_info)])
+
+    async def insert_media_group(
+        self, entries: List[Tuple[dict, int, int, str, str, Optional[dict]]]
+    ) -> Optional[ObjectId]:
+        """Merge files of one title in memory and commit them with a single write."""
+        media = None
+        for metadata_info, channel, msg_id, size, name, file_info in entries:
+            item = self._build_media(metadata_info, channel, msg_id, size, name, file_info)
+            if media is None:
+                media = item
+            elif isinstance(media, MovieSchema):
+                await self._merge_qualities(media.telegram, item.telegram)
+            else:
+                await self._merge_seasons(media.seasons, item.seasons)
+
+        if media is None:
+            return None
+        if isinstance(media, MovieSchema):
             return await self.update_movie(media)
-        else:
-            tv_show = TVShowSchema(
-                tmdb_id=metadata_info['tmdb_id'],
-                imdb_id=metadata_info['imdb_id'],
-                db_index=self.current_db_index,
-                title=metadata_info['title'],
-                genres=metadata_info['genres'],
-                description=metadata_info['description'],
-                rating=metadata_info['rate'],
-                release_year=metadata_info['year'],
-                poster=metadata_info['poster'],
-                backdrop=metadata_info['backdrop'],
-                logo=metadata_info['logo'],
-                media_type=metadata_info['media_type'],
-                seasons=[Season(
-                    season_number=metadata_info['season_number'],
-                    episodes=[Episode(
-                        episode_number=metadata_info['episode_number'],
-                        title=metadata_info['episode_title'],
-                        episode_backdrop=metadata_info['episode_backdrop'],
-                        telegram=[QualityDetail(
-                            quality=metadata_info['quality'],
-                            id=metadata_info['encoded_string'],
-                            name=name,
-                            size=size
-                        )]
-                    )]
-                )]
-            )
-            return await self.update_tv_show(tv_show)
+        return await self.update_tv_show(media)
 
     async def update_movie(self, movie_data: MovieSchema) -> Optional[ObjectId]:
         try:
@@ -241,31 +937,20 @@ class Database:
 
         title = movie_dict["title"]
         release_year = movie_dict["release_year"]
-        quality_to_update = movie_dict["telegram"][0]
-        target_quality = quality_to_update["quality"]
         current_db_key = f"storage_{self.current_db_index}"
 
         total_storage_dbs = len(self.dbs) - 1  
-        existing_db_key = None
-        existing_db_index = None
-        existing_movie = None
-
-        
-        for db_index in range(1, total_storage_dbs + 1):
-            db_key = f"storage_{db_index}"
-            movie = await self.dbs[db_key]["movie"].find_one(
-                    {"title": title, "release_year": release_year}
-            )
-            if movie:
-                existing_db_key = db_key
-                existing_db_index = db_index
-                existing_movie = movie
-                break
+        existing_db_index, existing_movie = await self._find_existing(
+            "movie", tmdb_id, title, release_year, projection={"tmdb_id": 1, **QUALITY_REF_PROJECTION}
+        )
+        existing_db_key = f"storage_{existing_db_index}"
 
         if not existing_movie:
             try:
                 movie_dict["db_index"] = self.current_db_index
                 result = await self.dbs[current_db_key]["movie"].insert_one(movie_dict)
+                await self.set_route("movie", tmdb_id, self.current_db_index)
+                await self._sync_catalog("movie", tmdb_id)
                 return result.inserted_id
             except Exception as e:
                 LOGGER.error(f"Insertion failed in {current_db_key}: {e}")
@@ -275,41 +960,43 @@ class Database:
 
         movie_id = existing_movie["_id"]
         existing_qualities = existing_movie.get("telegram", [])
-        matching_quality = next((q for q in existing_qualities if q["quality"] == target_quality), None)
-        if matching_quality:
-            
-            try:
-                old_id = matching_quality.get("id")
-                if old_id:
-                    decoded_data = await decode_string(old_id)
-                    chat_id = int(f"-100{decoded_data['chat_id']}")
-                    msg_id = int(decoded_data['msg_id'])
-                    create_task(delete_message(chat_id, msg_id))
-            except Exception as e:
-                LOGGER.error(f"Failed to queue old quality file for deletion: {e}")
-
-            matching_quality.update(quality_to_update)
-        else:
-            existing_qualities.append(quality_to_update)
-        existing_movie["telegram"] = existing_qualities
-        existing_movie["updated_on"] = datetime.utcnow()
-
-        if existing_db_index != self.current_db_index:
-            try:
-                if await self._move_document("movie", existing_movie, existing_db_index):
-                    return movie_id
-            except Exception as e:
-                LOGGER.error(f"Error moving movie to {current_db_key}: {e}")
-                if any(keyword in str(e).lower() for keyword in ["storage", "quota"]):
-                    return await self._handle_storage_error(self.update_movie, movie_data, total_storage_dbs=total_storage_dbs)
+        operations = []
+        for quality_to_update in movie_dict["telegram"]:
+            target_quality = quality_to_update["quality"]
+            matching_quality = next((q for q in existing_qualities if q.get("quality") == target_quality), None)
+            if matching_quality:
+                await self._queue_file_deletion(matching_quality)
+                operations.append(UpdateOne(
+                    {"_id": movie_id},
+                    {"$set": {"telegram.$[q]": quality_to_update}},
+                    array_filters=[{"q.quality": target_quality}]
+                ))
+            else:
+                operations.append(UpdateOne(
+                    {"_id": movie_id, "telegram.quality": {"$ne": target_quality}},
+                    {"$push": {"telegram": quality_to_update}}
+                ))
+        operations.append(UpdateOne({"_id": movie_id}, {"$set": {"updated_on": datetime.utcnow()}}))
+
+        # Titles stay where they are while their DB has room; only a title on a
+        # full DB is moved to the active one, so least_full switching the active
+        # DB does not shuffle titles on every update.
+        if existing_db_index != self.current_db_index and not self._has_room(existing_db_index):
+            full_document = await self.dbs[existing_db_key]["movie"].find_one({"_id": movie_id})
+            if full_document and await self._move_document("movie", full_document, existing_db_index):
+                existing_db_key = current_db_key
 
         try:
-            await self.dbs[existing_db_key]["movie"].replace_one({"_id": movie_id}, existing_movie)
-            return movie_id
+            await self.dbs[existing_db_key]["movie"].bulk_write(operations)
         except Exception as e:
             LOGGER.error(f"Failed to update movie {tmdb_id} in {existing_db_key}: {e}")
             if any(keyword in str(e).lower() for keyword in ["storage", "quota"]):
+                # The retry then moves the title off the DB that just refused it.
+                self._mark_full(existing_db_index)
                 return await self._handle_storage_error(self.update_movie, movie_data, total_storage_dbs=total_storage_dbs)
+            return None
+        await self._sync_catalog("movie", existing_movie["tmdb_id"])
+        return movie_id
 
     async def update_tv_show(self, tv_show_data: TVShowSchema) -> Optional[ObjectId]:
         try:
@@ -326,25 +1013,30 @@ class Database:
         current_db_key = f"storage_{self.current_db_index}"
         total_storage_dbs = len(self.dbs) - 1
 
-        existing_db_key = None
-        existing_db_index = None
-        existing_tv = None
-
-        for db_index in range(1, total_storage_dbs + 1):
-            db_key = f"storage_{db_index}"
-            tv = await self.dbs[db_key]["tv"].find_one(
-                    {"title": title, "release_year": release_year}
-            )
-            if tv:
-                existing_db_key = db_key
-                existing_db_index = db_index
-                existing_tv = tv
-                break
+        existing_db_index, existing_tv = await self._find_existing(
+            "tv", tmdb_id, title, release_year,
+            projection={
+                "tmdb_id": 1,
+                "episode_layout": 1,
+                "seasons.season_number": 1,
+                "seasons.episodes.episode_number": 1,
+                **{f"seasons.episodes.{field}": 1 for field in QUALITY_REF_PROJECTION}
+            }
+        )
+        existing_db_key = f"storage_{existing_db_index}"
 
         if not existing_tv:
             try:
                 tv_show_dict["db_index"] = self.current_db_index
+                seasons = tv_show_dict["seasons"]
+                if self.split_episodes:
+                    tv_show_dict["seasons"] = []
+                    tv_show_dict["episode_layout"] = "split"
                 result = await self.dbs[current_db_key]["tv"].insert_one(tv_show_dict)
+                if self.split_episodes:
+                    await self._write_split_episodes(current_db_key, tmdb_id, seasons)
+                await self.set_route("tv", tmdb_id, self.current_db_index)
+                await self._sync_catalog("tv", tmdb_id)
                 return result.inserted_id
             except Exception as e:
                 LOGGER.error(f"Insertion failed in {current_db_key}: {e}")
@@ -353,62 +1045,97 @@ class Database:
                 return None
 
         tv_id = existing_tv["_id"]
-        for season in tv_show_dict["seasons"]:
-            existing_season = next(
-                (s for s in existing_tv["seasons"] if s["season_number"] == season["season_number"]), None
-            )
-            if existing_season:
-                for episode in season["episodes"]:
-                    existing_episode = next(
-                        (e for e in existing_season["episodes"] if e["episode_number"] == episode["episode_number"]), None
-                    )
-                    if existing_episode:
-                        existing_episode.setdefault("telegram", [])
-                        for quality in episode["telegram"]:
-                            existing_quality = next(
-                                (q for q in existing_episode["telegram"]
-                                if q.get("quality") == quality.get("quality")),
-                                None
-                            )
-                            if existing_quality:
-                                try:
-                                    old_id = existing_quality.get("id")
-
-                                    if old_id:
-                                        decoded_data = await decode_string(old_id)
-
-                                        chat_id = int(f"-100{decoded_data['chat_id']}")
-                                        msg_id = int(decoded_data['msg_id'])
-                                        create_task(delete_message(chat_id, msg_id))
-                                        
-                                except Exception as e:
-                                    LOGGER.error(f"Failed to queue old quality file for deletion: {e}")
-                                existing_quality.update(quality)
-                            else:
-                                existing_episode["telegram"].append(quality)
-                    else:
-                        existing_season["episodes"].append(episode)
-            else:
-                existing_tv["seasons"].append(season)
-        existing_tv["updated_on"] = datetime.utcnow()
 
-        if existing_db_index != self.current_db_index:
-            try:
-                if await self._move_document("tv", existing_tv, existing_db_index):
-                    return tv_id
-            except Exception as e:
-                LOGGER.error(f"Error moving TV show to {current_db_key}: {e}")
-                if any(keyword in str(e).lower() for keyword in ["storage", "quota"]):
-                    return await self._handle_storage_error(self.update_tv_show, tv_show_data, total_storage_dbs=total_storage_dbs)
-            return tv_id
+        # Titles stay where they are while their DB has room; only a title on a
+        # full DB is moved to the active one, so least_full switching the active
+        # DB does not shuffle titles on every update.
+        if existing_db_index != self.current_db_index and not self._has_room(existing_db_index):
+            full_document = await self.dbs[existing_db_key]["tv"].find_one({"_id": tv_id})
+            if full_document and await self._move_document("tv", full_document, existing_db_index):
+                existing_db_key = current_db_key
 
         try:
-            await self.dbs[existing_db_key]["tv"].replace_one({"_id": tv_id}, existing_tv)
-            return tv_id
+            if existing_tv.get("episode_layout") == "split":
+                await self._write_split_episodes(existing_db_key, existing_tv["tmdb_id"], tv_show_dict["seasons"])
+                await self.dbs[existing_db_key]["tv"].update_one(
+                    {"_id": tv_id}, {"$set": {"updated_on": datetime.utcnow()}}
+                )
+            else:
+                operations = await self._embedded_episode_operations(tv_id, existing_tv, tv_show_dict["seasons"])
+                await self.dbs[existing_db_key]["tv"].bulk_write(operations)
         except Exception as e:
             LOGGER.error(f"Failed to update TV show {tmdb_id} in {existing_db_key}: {e}")
             if any(keyword in str(e).lower() for keyword in ["storage", "quota"]):
+                # The retry then moves the title off the DB that just refused it.
+                self._mark_full(existing_db_index)
                 return await self._handle_storage_error(self.update_tv_show, tv_show_data, total_storage_dbs=total_storage_dbs)
+            return None
+        await self._sync_catalog("tv", existing_tv["tmdb_id"])
+        return tv_id
+
+    async def _embedded_episode_operations(self, tv_id: ObjectId, existing_tv: dict, seasons: List[dict]) -> List[UpdateOne]:
+        operations = []
+        for season in seasons:
+            season_number = season["season_number"]
+            existing_season = next(
+                (s for s in existing_tv.get("seasons", []) if s.get("season_number") == season_number), None
+            )
+            if not existing_season:
+                operations.append(UpdateOne(
+                    {"_id": tv_id, "seasons.season_number": {"$ne": season_number}},
+                    {"$push": {"seasons": season}}
+                ))
+                continue
+
+            for episode in season["episodes"]:
+                episode_number = episode["episode_number"]
+                existing_episode = next(
+                    (e for e in existing_season.get("episodes", []) if e.get("episode_number") == episode_number), None
+                )
+                if not existing_episode:
+                    operations.append(UpdateOne(
+                        {"_id": tv_id, "seasons": {"$elemMatch": {
+                            "season_number": season_number,
+                            "episodes.episode_number": {"$ne": episode_number}
+                        }}},
+                        {"$push": {"seasons.$[s].episodes": episode}},
+                        array_filters=[{"s.season_number": season_number}]
+                    ))
+                    continue
+
+                for quality in episode.get("telegram") or []:
+                    target_quality = quality.get("quality")
+                    existing_quality = next(
+                        (q for q in existing_episode.get("telegram") or [] if q.get("quality") == target_quality), None
+                    )
+                    if existing_quality:
+                        await self._queue_file_deletion(existing_quality)
+                        operations.append(UpdateOne(
+                            {"_id": tv_id},
+                            {"$set": {"seasons.$[s].episodes.$[e].telegram.$[q]": quality}},
+                            array_filters=[
+                                {"s.season_number": season_number},
+                                {"e.episode_number": episode_number},
+                                {"q.quality": target_quality}
+                            ]
+                        ))
+                    else:
+                        operations.append(UpdateOne(
+                            {"_id": tv_id, "seasons": {"$elemMatch": {
+                                "season_number": season_number,
+                                "episodes": {"$elemMatch": {
+                                    "episode_number": episode_number,
+                                    "telegram.quality": {"$ne": target_quality}
+                                }}
+                            }}},
+                            {"$push": {"seasons.$[s].episodes.$[e].telegram": quality}},
+                            array_filters=[
+                                {"s.season_number": season_number},
+                                {"e.episode_number": episode_number}
+                            ]
+                        ))
+        operations.append(UpdateOne({"_id": tv_id}, {"$set": {"updated_on": datetime.utcnow()}}))
+        return operations
     
     async def sort_movies(self, sort_params, page, page_size, genre_filter=None):
         sort_dict = self._get_sort_dict(sort_params)
@@ -422,7 +1149,7 @@ class Database:
             "total_pages": total_pages,
             "databases_checked": dbs_checked,
             "current_page": page,
-            "movies": [convert_objectid_to_str(result) for result in results],
+            "movies": results,
         }
 
     async def sort_tv_shows(self, sort_params, page, page_size, genre_filter=None):
@@ -437,153 +1164,198 @@ class Database:
             "total_pages": total_pages,
             "databases_checked": dbs_checked,
             "current_page": page,
-            "tv_shows": [convert_objectid_to_str(result) for result in results],
+            "tv_shows": results,
         }
 
 
 
     async def search_documents(
-            self, 
-            query: str, 
-            page: int, 
-            page_size: int
-        ) -> dict:
+        self,
+        query: str,
+        page: int,
+        page_size: int,
+        media_type: Optional[str] = None
+    ) -> dict:
+        skip = (page - 1) * page_size
 
-            skip = (page - 1) * page_size
-            
-            words = query.split()
-            regex_query = {
-                '$regex': '.*' + '.*'.join(words) + '.*', 
-                '$options': 'i'
-            }
-            
-            tv_pipeline = [
-                {"$match": {"$or": [
-                    {"title": regex_query},
-                    {"seasons.episodes.telegram.name": regex_query}
-                ]}},
-                {"$project": {
-                    "_id": 1, "tmdb_id": 1, "title": 1, "genres": 1, "rating": 1, "imdb_id": 1,
-                    "release_year": 1, "poster": 1, "backdrop": 1, "description": 1, "logo": 1,
-                    "media_type": 1, "db_index": 1
-                }}
-            ]
-            
-            movie_pipeline = [
-                {"$match": {"$or": [
-                    {"title": regex_query},
-                    {"telegram.name": regex_query}
-                ]}},
-                {"$project": {
-                    "_id": 1, "tmdb_id": 1, "title": 1, "genres": 1, "rating": 1,
-                    "release_year": 1, "poster": 1, "backdrop": 1, "description": 1,
-                    "media_type": 1, "db_index": 1, "imdb_id": 1, "logo": 1
-                }}
-            ]
-            
-            results = []
-            dbs_checked = []
-            
-            active_db_key = f"storage_{self.current_db_index}"
-            active_db = self.dbs[active_db_key]
-            dbs_checked.append(self.current_db_index)
-            
-            tv_results = await active_db["tv"].aggregate(tv_pipeline).to_list(None)
-            movie_results = await active_db["movie"].aggregate(movie_pipeline).to_list(None)
-            combined = tv_results + movie_results
-            results.extend(combined)
-            
-            if len(results) < page_size:
-                previous_db_index = self.current_db_index - 1
-                while previous_db_index > 0 and len(results) < page_size:
-                    prev_db_key = f"storage_{previous_db_index}"
-                    prev_db = self.dbs[prev_db_key]
-                    tv_results_prev = await prev_db["tv"].aggregate(tv_pipeline).to_list(None)
-                    movie_results_prev = await prev_db["movie"].aggregate(movie_pipeline).to_list(None)
-                    combined_prev = tv_results_prev + movie_results_prev
-                    results.extend(combined_prev)
-                    dbs_checked.append(previous_db_index)
-                    previous_db_index -= 1
-
-            total_count = 0
-            for db_index in dbs_checked:
-                key = f"storage_{db_index}"
-                db = self.dbs[key]
-                tv_count = await db["tv"].count_documents({
-                    "$or": [
-                        {"title": regex_query},
-                        {"seasons.episodes.telegram.name": regex_query}
-                    ]
-                })
-                movie_count = await db["movie"].count_documents({
-                    "$or": [
-                        {"title": regex_query},
-                        {"telegram.name": regex_query}
+        words = query.split()
+        regex_query = {
+            '$regex': '.*' + '.*'.join(words) + '.*',
+            '$options': 'i'
+        }
+
+        collections = [
+            ("tv", {"$or": [
+                {"title": regex_query},
+                {"seasons.episodes.telegram.name": regex_query}
+            ]}),
+            ("movie", {"$or": [
+                {"title": regex_query},
+                {"telegram.name": regex_query}
+            ]}),
+        ]
+        if media_type:
+            collections = [(name, match) for name, match in collections if name == media_type]
+
+        projection = {
+            "_id": 1, "tmdb_id": 1, "title": 1, "genres": 1, "rating": 1, "imdb_id": 1,
+            "release_year": 1, "poster": 1, "backdrop": 1, "description": 1, "logo": 1,
+            "media_type": 1, "db_index": 1
+        }
+
+        results = []
+        dbs_checked = []
+        total_count = 0
+
+        # Walk storage DBs newest first, asking each one only for the slice of
+        # the page it can still contribute plus its total match count. Every DB
+        # is walked: least_full and the rebalancer can place titles above the
+        # active one.
+        for db_index in range(len(self.dbs) - 1, 0, -1):
+            db = self.dbs[f"storage_{db_index}"]
+            dbs_checked.append(db_index)
+
+            for collection_name, match in collections:
+                if collection_name == "tv":
+                    split_ids = await db["episodes"].distinct("tmdb_id", {"telegram.name": regex_query})
+                    if split_ids:
+                        match = {"$or": match["$or"] + [{"tmdb_id": {"$in": split_ids}}]}
+                remaining = page_size - len(results)
+                if remaining > 0:
+                    pipeline = [
+                        {"$match": match},
+                        {"$facet": {
+                            "results": [
+                                {"$sort": {"updated_on": DESCENDING}},
+                                {"$skip": skip},
+                                {"$limit": remaining},
+                                {"$project": projection}
+                            ],
+                            "total": [{"$count": "count"}]
+                        }}
                     ]
-                })
-                total_count += (tv_count + movie_count)
-            
-            paged_results = results[skip:skip + page_size]
+                    facet = await db[collection_name].aggregate(pipeline).to_list(1)
+                    facet = facet[0] if facet else {"results": [], "total": []}
+                    count = facet["total"][0]["count"] if facet["total"] else 0
+                    results.extend(facet["results"])
+                    skip = max(skip - count, 0)
+                else:
+                    count = await db[collection_name].count_documents(match)
+                total_count += count
 
-            return {
-                "total_count": total_count,
-                "results": [convert_objectid_to_str(doc) for doc in paged_results]
-            }
+        return {
+            "total_count": total_count,
+            "total_pages": (total_count + page_size - 1) // page_size,
+            "databases_checked": dbs_checked,
+            "current_page": page,
+            "results": results
+        }
 
 
     async def get_media_details(
-        self, tmdb_id: int, db_index: int,
-        season_number: Optional[int] = None, episode_number: Optional[int] = None
+        self, tmdb_id: int, db_index: Optional[int] = None,
+        season_number: Optional[int] = None, episode_number: Optional[int] = None,
+        media_type: Optional[str] = None
     ) -> Optional[dict]:
+        if season_number is not None:
+            media_type = "tv"
+        lookup_types = [self._collection_name(media_type)] if media_type else ["tv", "movie"]
+        for collection_name in lookup_types:
+            resolved_index = await self.resolve_db_index(collection_name, tmdb_id, hint=db_index)
+            if resolved_index:
+                db_index, media_type = resolved_index, collection_name
+                break
+        else:
+            return None
+
         db_key = f"storage_{db_index}"
         if episode_number is not None and season_number is not None:
-            tv_show = await self.dbs[db_key]["tv"].find_one({"tmdb_id": tmdb_id})
+            tv_show = await self._project_tv_season(db_key, tmdb_id, season_number, episode_number)
             if not tv_show:
                 return None
-            for season in tv_show.get("seasons", []):
-                if season.get("season_number") == season_number:
-                    for episode in season.get("episodes", []):
-                        if episode.get("episode_number") == episode_number:
-                            details = convert_objectid_to_str(episode)
-                            details.update({
-                                "tmdb_id": tmdb_id,
-                                "type": "tv",
-                                "season_number": season_number,
-                                "episode_number": episode_number,
-                                "backdrop": episode.get("episode_backdrop")
-                            })
-                            return details
-            return None
+            if tv_show.get("episode_layout") == "split":
+                episode = await self.dbs[db_key]["episodes"].find_one(
+                    {"tmdb_id": tmdb_id, "season_number": season_number, "episode_number": episode_number},
+                    {"_id": 0, "tmdb_id": 0, "season_number": 0}
+                )
+            else:
+                episode = tv_show.get("episode")
+            if not episode:
+                return None
+            episode.update({
+                "tmdb_id": tmdb_id,
+                "type": "tv",
+                "season_number": season_number,
+                "episode_number": episode_number,
+                "backdrop": episode.get("episode_backdrop")
+            })
+            return episode
 
         elif season_number is not None:
-            tv_show = await self.dbs[db_key]["tv"].find_one({"tmdb_id": tmdb_id})
+            tv_show = await self._project_tv_season(db_key, tmdb_id, season_number)
             if not tv_show:
                 return None
-            for season in tv_show.get("seasons", []):
-                if season.get("season_number") == season_number:
-                    details = convert_objectid_to_str(season)
-                    details.update({
-                        "tmdb_id": tmdb_id,
-                        "type": "tv",
-                        "season_number": season_number
-                    })
-                    return details
-            return None
+            if tv_show.get("episode_layout") == "split":
+                seasons = await self._load_split_seasons(db_key, tmdb_id, season_number)
+                season = seasons[0] if seasons else None
+            else:
+                season = tv_show.get("season")
+            if not season:
+                return None
+            season.update({
+                "tmdb_id": tmdb_id,
+                "type": "tv",
+                "season_number": season_number
+            })
+            return season
 
         else:
-            tv_doc = await self.dbs[db_key]["tv"].find_one({"tmdb_id": tmdb_id})
-            if tv_doc:
-                tv_doc = convert_objectid_to_str(tv_doc)
-                tv_doc["type"] = "tv"
-                return tv_doc
-            movie_doc = await self.dbs[db_key]["movie"].find_one({"tmdb_id": tmdb_id})
-            if movie_doc:
-                movie_doc = convert_objectid_to_str(movie_doc)
-                movie_doc["type"] = "movie"
-                return movie_doc
+            doc = await self.dbs[db_key][media_type].find_one({"tmdb_id": tmdb_id})
+            if doc:
+                if doc.get("episode_layout") == "split":
+                    # Catalog meta only lists episodes, so stream files stay in the DB.
+                    doc["seasons"] = await self._load_split_seasons(db_key, tmdb_id, include_files=False)
+                doc["type"] = media_type
+                return doc
             return None
 
 
+    async def _project_tv_season(
+        self, db_key: str, tmdb_id: int, season_number: int, episode_number: Optional[int] = None
+    ) -> Optional[dict]:
+        # Slice the season (and optionally the episode) out on the server so only
+        # that part of a long show's document is sent back.
+        pipeline = [
+            {"$match": {"tmdb_id": tmdb_id}},
+            {"$project": {
+                "_id": 0,
+                "episode_layout": 1,
+                "season": {"$arrayElemAt": [
+                    {"$filter": {
+                        "input": {"$ifNull": ["$seasons", []]},
+                        "as": "s",
+                        "cond": {"$eq": ["$$s.season_number", season_number]}
+                    }},
+                    0
+                ]}
+            }}
+        ]
+        if episode_number is not None:
+            pipeline.append({"$project": {
+                "episode_layout": 1,
+                "episode": {"$arrayElemAt": [
+                    {"$filter": {
+                        "input": {"$ifNull": ["$season.episodes", []]},
+                        "as": "e",
+                        "cond": {"$eq": ["$$e.episode_number", episode_number]}
+                    }},
+                    0
+                ]}
+            }})
+        result = await self.dbs[db_key]["tv"].aggregate(pipeline).to_list(1)
+        return result[0] if result else None
+
+
     # -------------------------------
     # DB Method for Edit Post
     # -------------------------------
@@ -596,7 +1368,9 @@ class Database:
         else:
             collection_name = "movie"
         document = await self.dbs[db_key][collection_name].find_one({"tmdb_id": int(tmdb_id)})
-        return convert_objectid_to_str(document) if document else None
+        if document and document.get("episode_layout") == "split":
+            document["seasons"] = await self._load_split_seasons(db_key, int(tmdb_id))
+        return document
 
     async def update_document(
         self, media_type: str, tmdb_id: int, db_index: int, update_data: Dict[str, Any]
@@ -611,7 +1385,7 @@ class Database:
 
         try:
             result = await collection.update_one({"tmdb_id": int(tmdb_id)}, {"$set": update_data})
-
+            await self._sync_catalog(collection_name, tmdb_id)
             return result.modified_count > 0
 
         except Exception as e:
@@ -637,10 +1411,17 @@ class Database:
                     old_doc.update(update_data)
                     old_doc["db_index"] = next_db_index
                     old_doc.pop("_id", None)
+                    split = old_doc.get("episode_layout") == "split"
+                    if split:
+                        await self._copy_episodes(db_key, new_db_key, int(tmdb_id))
                     insert_result = await self.dbs[new_db_key][collection_name].insert_one(old_doc)
                     LOGGER.info(f"Inserted document {insert_result.inserted_id} into {new_db_key}")
+                    await self.set_route(collection_name, tmdb_id, next_db_index)
                     await self.dbs[db_key][collection_name].delete_one({"tmdb_id": int(tmdb_id)})
+                    if split:
+                        await self.dbs[db_key]["episodes"].delete_many({"tmdb_id": int(tmdb_id)})
                     LOGGER.info(f"Deleted document tmdb_id {tmdb_id} from {db_key}")
+                    await self._sync_catalog(collection_name, tmdb_id)
                     self.current_db_index = next_db_index
                     await self.update_current_db_index()
                     LOGGER.info(f"Switched to {new_db_key} and document migrated successfully.")
@@ -656,39 +1437,31 @@ class Database:
         db_key = f"storage_{db_index}"
 
         if media_type == "Movie":
-            doc = await self.dbs[db_key]["movie"].find_one({"tmdb_id": tmdb_id})
-            if doc and "telegram" in doc:
-                for quality in doc["telegram"]:
-                    try:
-                        old_id = quality.get("id")
-                        if old_id:
-                            decoded_data = await decode_string(old_id)
-                            chat_id = int(f"-100{decoded_data['chat_id']}")
-                            msg_id = int(decoded_data['msg_id'])
-                            create_task(delete_message(chat_id, msg_id))
-                    except Exception as e:
-                        LOGGER.error(f"Failed to queue file for deletion: {e}")
+            doc = await self.dbs[db_key]["movie"].find_one({"tmdb_id": tmdb_id}, QUALITY_REF_PROJECTION)
+            if doc:
+                await self._queue_file_deletions(doc.get("telegram") or [])
             
             result = await self.dbs[db_key]["movie"].delete_one({"tmdb_id": tmdb_id})
         else:
-            doc = await self.dbs[db_key]["tv"].find_one({"tmdb_id": tmdb_id})
-            if doc and "seasons" in doc:
-                for season in doc["seasons"]:
-                    for episode in season.get("episodes", []):
-                        for quality in episode.get("telegram", []):
-                            try:
-                                old_id = quality.get("id")
-                                if old_id:
-                                    decoded_data = await decode_string(old_id)
-                                    chat_id = int(f"-100{decoded_data['chat_id']}")
-                                    msg_id = int(decoded_data['msg_id'])
-                                    create_task(delete_message(chat_id, msg_id))
-                            except Exception as e:
-                                LOGGER.error(f"Failed to queue file for deletion: {e}")
+            doc = await self.dbs[db_key]["tv"].find_one(
+                {"tmdb_id": tmdb_id}, {"episode_layout": 1, **{f"seasons.episodes.{field}": 1 for field in QUALITY_REF_PROJECTION}}
+            )
+            if doc and doc.get("episode_layout") == "split":
+                doc["seasons"] = await self._load_split_seasons(db_key, tmdb_id)
+                await self.dbs[db_key]["episodes"].delete_many({"tmdb_id": tmdb_id})
+            if doc:
+                await self._queue_file_deletions([
+                    quality
+                    for season in doc.get("seasons", [])
+                    for episode in season.get("episodes", [])
+                    for quality in episode.get("telegram") or []
+                ])
             
             result = await self.dbs[db_key]["tv"].delete_one({"tmdb_id": tmdb_id})
         
         if result.deleted_count > 0:
+            await self.drop_route(media_type, tmdb_id)
+            await self._sync_catalog(media_type, tmdb_id)
             LOGGER.info(f"{media_type} with tmdb_id {tmdb_id} deleted successfully.")
             return True
         LOGGER.info(f"No document found with tmdb_id {tmdb_id}.")
@@ -698,156 +1471,156 @@ class Database:
     # Delete a specific quality from movie
     async def delete_movie_quality(self, tmdb_id: int, db_index: int, quality: str) -> bool:
         db_key = f"storage_{db_index}"
-        movie = await self.dbs[db_key]["movie"].find_one({"tmdb_id": tmdb_id})
+        movie = await self.dbs[db_key]["movie"].find_one(
+            {"tmdb_id": tmdb_id}, {"telegram": {"$elemMatch": {"quality": quality}}}
+        )
         
-        if not movie or "telegram" not in movie:
+        if not movie or not movie.get("telegram"):
             return False
 
-        for q in movie["telegram"]:
-            if q.get("quality") == quality:
-                try:
-                    old_id = q.get("id")
-                    if old_id:
-                        decoded_data = await decode_string(old_id)
-                        chat_id = int(f"-100{decoded_data['chat_id']}")
-                        msg_id = int(decoded_data['msg_id'])
-                        create_task(delete_message(chat_id, msg_id))
-                except Exception as e:
-                    LOGGER.error(f"Failed to queue file for deletion: {e}")
-                break
-        
-        original_len = len(movie["telegram"])
-        movie["telegram"] = [q for q in movie["telegram"] if q.get("quality") != quality]
-        
-        if len(movie["telegram"]) == original_len:
-            return False
-        
-        movie['updated_on'] = datetime.utcnow()
-        result = await self.dbs[db_key]["movie"].replace_one({"tmdb_id": tmdb_id}, movie)
+        await self._queue_file_deletion(movie["telegram"][0])
+        result = await self.dbs[db_key]["movie"].update_one(
+            {"tmdb_id": tmdb_id},
+            {"$pull": {"telegram": {"quality": quality}}, "$set": {"updated_on": datetime.utcnow()}}
+        )
+        await self._sync_catalog("movie", tmdb_id)
         return result.modified_count > 0
 
     # Delete a specific episode from a TV show
     async def delete_tv_episode(self, tmdb_id: int, db_index: int, season_number: int, episode_number: int) -> bool:
         db_key = f"storage_{db_index}"
-        tv = await self.dbs[db_key]["tv"].find_one({"tmdb_id": tmdb_id})
+        tv = await self.dbs[db_key]["tv"].find_one(
+            {"tmdb_id": tmdb_id},
+            {"episode_layout": 1, "seasons": {"$elemMatch": {"season_number": season_number}}}
+        )
         
-        if not tv or "seasons" not in tv:
+        if not tv:
             return False
-        
-        found = False
-        for season in tv["seasons"]:
-            if season.get("season_number") == season_number:
-                for ep in season["episodes"]:
-                    if ep.get("episode_number") == episode_number:
-                        for quality in ep.get("telegram", []):
-                            try:
-                                old_id = quality.get("id")
-                                if old_id:
-                                    decoded_data = await decode_string(old_id)
-                                    chat_id = int(f"-100{decoded_data['chat_id']}")
-                                    msg_id = int(decoded_data['msg_id'])
-                                    create_task(delete_message(chat_id, msg_id))
-                            except Exception as e:
-                                LOGGER.error(f"Failed to queue file for deletion: {e}")
-                        break
-                
-                original_len = len(season["episodes"])
-                season["episodes"] = [ep for ep in season["episodes"] if ep.get("episode_number") != episode_number]
-                found = original_len > len(season["episodes"])
-                break
-        
-        if not found:
+
+        if tv.get("episode_layout") == "split":
+            key = {"tmdb_id": tmdb_id, "season_number": season_number, "episode_number": episode_number}
+            episode = await self.dbs[db_key]["episodes"].find_one(key, QUALITY_REF_PROJECTION)
+            if not episode:
+                return False
+            await self._queue_file_deletions(episode.get("telegram") or [])
+            result = await self.dbs[db_key]["episodes"].delete_one(key)
+            await self.dbs[db_key]["tv"].update_one({"tmdb_id": tmdb_id}, {"$set": {"updated_on": datetime.utcnow()}})
+            await self._sync_catalog("tv", tmdb_id)
+            return result.deleted_count > 0
+
+        if not tv.get("seasons"):
             return False
         
-        tv['updated_on'] = datetime.utcnow()
-        result = await self.dbs[db_key]["tv"].replace_one({"tmdb_id": tmdb_id}, tv)
+        episode = next(
+            (ep for ep in tv["seasons"][0].get("episodes", []) if ep.get("episode_number") == episode_number), None
+        )
+        if not episode:
+            return False
+
+        await self._queue_file_deletions(episode.get("telegram") or [])
+
+        result = await self.dbs[db_key]["tv"].update_one(
+            {"tmdb_id": tmdb_id},
+            {
+                "$pull": {"seasons.$[s].episodes": {"episode_number": episode_number}},
+                "$set": {"updated_on": datetime.utcnow()}
+            },
+            array_filters=[{"s.season_number": season_number}]
+        )
+        await self._sync_catalog("tv", tmdb_id)
         return result.modified_count > 0
 
     # Delete a whole season from a TV show
     async def delete_tv_season(self, tmdb_id: int, db_index: int, season_number: int) -> bool:
         db_key = f"storage_{db_index}"
-        tv = await self.dbs[db_key]["tv"].find_one({"tmdb_id": tmdb_id})
+        tv = await self.dbs[db_key]["tv"].find_one(
+            {"tmdb_id": tmdb_id},
+            {"episode_layout": 1, "seasons": {"$elemMatch": {"season_number": season_number}}}
+        )
         
-        if not tv or "seasons" not in tv:
+        if not tv:
             return False
-        
-        for season in tv["seasons"]:
-            if season.get("season_number") == season_number:
-                for episode in season.get("episodes", []):
-                    for quality in episode.get("telegram", []):
-                        try:
-                            old_id = quality.get("id")
-                            if old_id:
-                                decoded_data = await decode_string(old_id)
-                                chat_id = int(f"-100{decoded_data['chat_id']}")
-                                msg_id = int(decoded_data['msg_id'])
-                                create_task(delete_message(chat_id, msg_id))
-                        except Exception as e:
-                            LOGGER.error(f"Failed to queue file for deletion: {e}")
-                break
-        
-        original_len = len(tv["seasons"])
-        tv["seasons"] = [s for s in tv["seasons"] if s.get("season_number") != season_number]
-        
-        if len(tv["seasons"]) == original_len:
+
+        if tv.get("episode_layout") == "split":
+            key = {"tmdb_id": tmdb_id, "season_number": season_number}
+            await self._queue_file_deletions([
+                quality
+                async for episode in self.dbs[db_key]["episodes"].find(key, QUALITY_REF_PROJECTION)
+                for quality in episode.get("telegram") or []
+            ])
+            result = await self.dbs[db_key]["episodes"].delete_many(key)
+            await self.dbs[db_key]["tv"].update_one({"tmdb_id": tmdb_id}, {"$set": {"updated_on": datetime.utcnow()}})
+            await self._sync_catalog("tv", tmdb_id)
+            return result.deleted_count > 0
+
+        if not tv.get("seasons"):
             return False
         
-        tv['updated_on'] = datetime.utcnow()
-        result = await self.dbs[db_key]["tv"].replace_one({"tmdb_id": tmdb_id}, tv)
+        await self._queue_file_deletions([
+            quality
+            for episode in tv["seasons"][0].get("episodes", [])
+            for quality in episode.get("telegram") or []
+        ])
+
+        result = await self.dbs[db_key]["tv"].update_one(
+            {"tmdb_id": tmdb_id},
+            {"$pull": {"seasons": {"season_number": season_number}}, "$set": {"updated_on": datetime.utcnow()}}
+        )
+        await self._sync_catalog("tv", tmdb_id)
         return result.modified_count > 0
 
     # Delete a specific quality from a given TV episode
     async def delete_tv_quality(self, tmdb_id: int, db_index: int, season_number: int, episode_number: int, quality: str) -> bool:
         db_key = f"storage_{db_index}"
-        tv = await self.dbs[db_key]["tv"].find_one({"tmdb_id": tmdb_id})
+        tv = await self.dbs[db_key]["tv"].find_one(
+            {"tmdb_id": tmdb_id},
+            {"episode_layout": 1, "seasons": {"$elemMatch": {"season_number": season_number}}}
+        )
         
-        if not tv or "seasons" not in tv:
+        if not tv:
+            return False
+
+        if tv.get("episode_layout") == "split":
+            key = {"tmdb_id": tmdb_id, "season_number": season_number, "episode_number": episode_number}
+            episode = await self.dbs[db_key]["episodes"].find_one(
+                key, {"telegram": {"$elemMatch": {"quality": quality}}}
+            )
+            if not episode or not episode.get("telegram"):
+                return False
+            await self._queue_file_deletion(episode["telegram"][0])
+            result = await self.dbs[db_key]["episodes"].update_one(key, {"$pull": {"telegram": {"quality": quality}}})
+            await self.dbs[db_key]["tv"].update_one({"tmdb_id": tmdb_id}, {"$set": {"updated_on": datetime.utcnow()}})
+            await self._sync_catalog("tv", tmdb_id)
+            return result.modified_count > 0
+
+        if not tv.get("seasons"):
             return False
         
-        found = False
-        for season in tv["seasons"]:
-            if season.get("season_number") == season_number:
-                for episode in season["episodes"]:
-                    if episode.get("episode_number") == episode_number and "telegram" in episode:
-                        for q in episode["telegram"]:
-                            if q.get("quality") == quality:
-                                try:
-                                    old_id = q.get("id")
-                                    if old_id:
-                                        decoded_data = await decode_string(old_id)
-                                        chat_id = int(f"-100{decoded_data['chat_id']}")
-                                        msg_id = int(decoded_data['msg_id'])
-                                        create_task(delete_message(chat_id, msg_id))
-                                except Exception as e:
-                                    LOGGER.error(f"Failed to queue file for deletion: {e}")
-                                break
-                        
-                        original_len = len(episode["telegram"])
-                        episode["telegram"] = [q for q in episode["telegram"] if q.get("quality") != quality]
-                        found = original_len > len(episode["telegram"])
-                        break
-        
-        if not found:
+        episode = next(
+            (ep for ep in tv["seasons"][0].get("episodes", []) if ep.get("episode_number") == episode_number), None
+        )
+        matching_quality = next(
+            (q for q in (episode or {}).get("telegram") or [] if q.get("quality") == quality), None
+        )
+        if not matching_quality:
             return False
-        tv['updated_on'] = datetime.utcnow()
-        result = await self.dbs[db_key]["tv"].replace_one({"tmdb_id": tmdb_id}, tv)
+
+        await self._queue_file_deletion(matching_quality)
+        result = await self.dbs[db_key]["tv"].update_one(
+            {"tmdb_id": tmdb_id},
+            {
+                "$pull": {"seasons.$[s].episodes.$[e].telegram": {"quality": quality}},
+                "$set": {"updated_on": datetime.utcnow()}
+            },
+            array_filters=[{"s.season_number": season_number}, {"e.episode_number": episode_number}]
+        )
+        await self._sync_catalog("tv", tmdb_id)
         return result.modified_count > 0
 
 
-    # Get per-DB statistics (movies, tv shows, used size, etc.)
+    # Get per-DB statistics (movies, tv shows, used size, etc.) from the
+    # background-refreshed cache
     async def get_database_stats(self):
-        stats = []
-        for key in self.dbs.keys():
-            if key.startswith("storage_"):
-                db = self.dbs[key]
-                movie_count = await db["movie"].count_documents({})
-                tv_count = await db["tv"].count_documents({})
-                db_stats = await db.command("dbstats")
-                stats.append({
-                    "db_name": key,
-                    "movie_count": movie_count,
-                    "tv_count": tv_count,
-                    "storageSize": db_stats.get("storageSize", 0),
-                    "dataSize": db_stats.get("dataSize", 0)
-                })
-        return stats
\ No newline at end of file
+        if self.stats_cache["updated_on"] is None:
+            await self.refresh_stats()
+        return self.stats_cache["databases"]
\ No newline at end of file
@@ -0,0 +1,76 @@
+from hashlib import blake2b
+from typing import Dict, List, Optional
+from Backend import db
+from Backend.logger import LOGGER
+
+
+def title_signature(title: str) -> str:
+    return blake2b((title or "").encode("utf-8"), digest_size=8).hexdigest()
+
+
+class IngestIndex:
+    """Which Telegram files were already ingested, by file_unique_id.
+
+    An entry remembers the message a file was taken from and the caption or
+    file name signatures it was resolved with, so an edit that leaves them
+    unchanged (our own USE_DEFAULT_ID caption included) or a re-forward of the
+    same file is dropped before any metadata lookup. Files still in the
+    pipeline are held in memory; committed ones live in the tracking DB and
+    are removed again when their message is deleted from the library.
+    """
+
+    def __init__(self):
+        self.pending: Dict[str, dict] = {}
+
+    async def _lookup(self, file_unique_id: str) -> Optional[dict]:
+        if file_unique_id in self.pending:
+            return self.pending[file_unique_id]
+        try:
+            return await db.get_ingest_entry(file_unique_id)
+        except Exception as e:
+            LOGGER.debug(f"Ingest index lookup failed for {file_unique_id}: {e}")
+            return None
+
+    async def check(self, job: dict) -> Optional[str]:
+        """Return why job can be skipped ("unchanged" / "duplicate"), or None to ingest it."""
+        entry = await self._lookup(job["file_info"]["file_unique_id"])
+        if entry is None:
+            return None
+        if (entry["chat_id"], entry["msg_id"]) != (job["chat_id"], job["msg_id"]):
+            return "duplicate"
+        if title_signature(job["title"]) in entry["signatures"]:
+            return "unchanged"
+        return None
+
+    def begin(self, job: dict):
+        self.pending[job["file_info"]["file_unique_id"]] = {
+            "chat_id": job["chat_id"],
+            "msg_id": job["msg_id"],
+            "signatures": {title_signature(job["title"])}
+        }
+
+    def add_signature(self, file_unique_id: str, title: str):
+        entry = self.pending.get(file_unique_id)
+        if entry is not None:
+            entry["signatures"].add(title_signature(title))
+
+    def abandon(self, file_unique_id: Optional[str]):
+        self.pending.pop(file_unique_id, None)
+
+    async def commit(self, entries: List[tuple]):
+        records = []
+        for entry in entries:
+            file_info = entry[5] if len(entry) > 5 else None
+            if not file_info or not file_info.get("file_unique_id"):
+                continue
+            file_unique_id = file_info["file_unique_id"]
+            # Entries replayed from the journal have no pending record.
+            record = self.pending.pop(file_unique_id, None) or {
+                "chat_id": int(f"-100{entry[1]}"), "msg_id": entry[2], "signatures": set()
+            }
+            records.append({"_id": file_unique_id, **record})
+        if records:
+            await db.record_ingest_entries(records)
+
+
+ingest_index = IngestIndex()
@@ -0,0 +1,64 @@
+from typing import Optional
+import httpx
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+from Backend.config import Telegram
+from Backend.logger import LOGGER
+
+try:
+    import h2  # noqa: F401
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
+
+_client: Optional[httpx.AsyncClient] = None
+_session: Optional[ClientSession] = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """Process-wide httpx client; connections are kept alive between lookups."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=HTTP2,
+            timeout=httpx.Timeout(10.0, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=Telegram.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=Telegram.HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=Telegram.HTTP_KEEPALIVE_EXPIRY
+            ),
+            headers={"User-Agent": "Telegram-Stremio"}
+        )
+    return _client
+
+
+def get_session() -> ClientSession:
+    """Process-wide aiohttp session for the TMDb client, which only accepts aiohttp."""
+    global _session
+    if _session is None or _session.closed:
+        _session = ClientSession(
+            connector=TCPConnector(
+                limit=Telegram.HTTP_MAX_CONNECTIONS,
+                ttl_dns_cache=300,
+                keepalive_timeout=Telegram.HTTP_KEEPALIVE_EXPIRY
+            ),
+            timeout=ClientTimeout(total=15),
+            # Same behaviour as the per-call sessions themoviedb opens itself.
+            raise_for_status=True
+        )
+    return _session
+
+
+async def start_http_clients():
+    get_client()
+    get_session()
+    LOGGER.info(f"Shared HTTP clients ready (HTTP/2 {'enabled' if HTTP2 else 'unavailable'})")
+
+
+async def close_http_clients():
+    global _client, _session
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+    if _session is not None:
+        await _session.close()
+        _session = None
@@ -1,9 +1,21 @@
 import httpx
 import re
-from typing import Optional, Dict, Any
+from collections import OrderedDict
+from time import monotonic
+from typing import Optional, Dict, Any, Tuple
+from Backend.helper.http import get_client
+from Backend.helper.providers import ProviderError
 
 BASE_URL = "https://v3-cinemeta.strem.io"
 
+
+def raise_for_retryable(response: httpx.Response):
+    # 429/5xx are surfaced so call_provider can back off and retry; any other
+    # non-200 still means "not found" to the callers below.
+    if response.status_code == 429 or response.status_code >= 500:
+        retry_after = response.headers.get("Retry-After", "")
+        raise ProviderError(response.status_code, float(retry_after) if retry_after.isdigit() else None)
+
 def extract_first_year(year_string) -> int:
     if not year_string:
         return 0
@@ -15,92 +27,153 @@ def extract_first_year(year_string) -> int:
 
 
 async def search_title(query: str, type: str) -> Optional[Dict[str, Any]]:
-    async with httpx.AsyncClient() as client:
-        cinemeta_type = "series" if type == "tvSeries" else type  
-        url = f"{BASE_URL}/catalog/{cinemeta_type}/imdb/search={query}.json"
-        try:
-            response = await client.get(url, timeout=10.0)
-            if response.status_code != 200:
-                return None
-            data = response.json()
-            
-            if data and 'metas' in data and data['metas']:
-                meta = data['metas'][0]
-                return {
-                    'id': meta.get('imdb_id', meta.get('id', '')),
-                    'type': type,  
-                    'title': meta.get('name', ''),
-                    'year': meta.get('releaseInfo', ''),
-                    'poster': meta.get('poster', '')
-                }
-            
-            return None  
-        except Exception:
+    client = get_client()
+    cinemeta_type = "series" if type == "tvSeries" else type  
+    url = f"{BASE_URL}/catalog/{cinemeta_type}/imdb/search={query}.json"
+    try:
+        response = await client.get(url)
+        raise_for_retryable(response)
+        if response.status_code != 200:
             return None
+        data = response.json()
+        
+        if data and 'metas' in data and data['metas']:
+            meta = data['metas'][0]
+            return {
+                'id': meta.get('imdb_id', meta.get('id', '')),
+                'type': type,  
+                'title': meta.get('name', ''),
+                'year': meta.get('releaseInfo', ''),
+                'poster': meta.get('poster', '')
+            }
+        
+        return None  
+    except (ProviderError, httpx.TransportError):
+        raise
+    except Exception:
+        return None
 
 async def get_detail(imdb_id: str) -> Optional[Dict[str, Any]]:
-    async with httpx.AsyncClient() as client:
-        for media_type in ['movie', 'series']:
-            try:
-                url = f"{BASE_URL}/meta/{media_type}/{imdb_id}.json"
-                response = await client.get(url, timeout=10.0)
-                if response.status_code == 200:
-                    data = response.json()
-                    if 'meta' in data:
-                        meta = data['meta']
-                        year_value = 0
-                        for year_field in ['year', 'releaseInfo', 'released']:
-                            if meta.get(year_field):
-                                year_value = extract_first_year(meta[year_field])
-                                if year_value > 0:
-                                    break
-                        return {
-                            'id': meta.get('imdb_id', meta.get('id', '')),
-                            'type': meta.get('type', media_type),
-                            'title': meta.get('name', ''),
-                            'plot': meta.get('description', ''),
-                            'genre': meta.get('genres', []) or meta.get('genre', []),
-                            'releaseDetailed': {
-                                'year': year_value
-                            },
-                            'rating': {
-                                'star': float(meta.get('imdbRating', '0')) if meta.get('imdbRating') else 0
-                            },
-                            'poster': meta.get('poster', ''),
-                            'background': meta.get('background', ''),
-                            'logo': meta.get('logo', ''),
-                            'runtime': meta.get('runtime', ''),
-                            'director': meta.get('director', []),
-                            'cast': meta.get('cast', []),
-                            'videos': meta.get('videos', [])
-                        }
-                        
-            except Exception:
-                continue
+    client = get_client()
+    for media_type in ['movie', 'series']:
+        try:
+            url = f"{BASE_URL}/meta/{media_type}/{imdb_id}.json"
+            response = await client.get(url)
+            raise_for_retryable(response)
+            if response.status_code == 200:
+                data = response.json()
+                if 'meta' in data:
+                    meta = data['meta']
+                    year_value = 0
+                    for year_field in ['year', 'releaseInfo', 'released']:
+                        if meta.get(year_field):
+                            year_value = extract_first_year(meta[year_field])
+                            if year_value > 0:
+                                break
+                    return {
+                        'id': meta.get('imdb_id', meta.get('id', '')),
+                        'type': meta.get('type', media_type),
+                        'title': meta.get('name', ''),
+                        'plot': meta.get('description', ''),
+                        'genre': meta.get('genres', []) or meta.get('genre', []),
+                        'releaseDetailed': {
+                            'year': year_value
+                        },
+                        'rating': {
+                            'star': float(meta.get('imdbRating', '0')) if meta.get('imdbRating') else 0
+                        },
+                        'poster': meta.get('poster', ''),
+                        'background': meta.get('background', ''),
+                        'logo': meta.get('logo', ''),
+                        'runtime': meta.get('runtime', ''),
+                        'director': meta.get('director', []),
+                        'cast': meta.get('cast', []),
+                        'videos': meta.get('videos', [])
+                    }
+                    
+        except (ProviderError, httpx.TransportError):
+            raise
+        except Exception:
+            continue
+    return None
+
+def _format_episode(video: Dict[str, Any], season_id, episode_id) -> Dict[str, Any]:
+    return {
+        'title': video.get('title', f'Episode {episode_id}'),
+        'no': str(episode_id),
+        'season': str(season_id),
+        'image': video.get('thumbnail', ''),
+        'plot': video.get('overview', ''),
+        'released': video.get('released', '')
+    }
+
+
+# imdb_id -> (loaded_at, {(season, episode): episode}); Cinemeta series metas
+# list every episode, so one download answers every file of a show.
+episode_tables: "OrderedDict[str, Tuple[float, Dict[Tuple[int, int], Dict[str, Any]]]]" = OrderedDict()
+EPISODE_TABLE_TTL = 6 * 3600
+EPISODE_TABLE_REFRESH = 10 * 60
+EPISODE_TABLES_MAX = 512
+
+
+def index_episodes(
+    imdb_id: str, videos: list, replace: bool = True, from_cache: bool = False
+) -> Dict[Tuple[int, int], Dict[str, Any]]:
+    # Cached detail can be days old, so a table built from it is stamped as
+    # due for refresh: the first miss on it re-downloads the show.
+    if not replace and _fresh_table(imdb_id) is not None:
+        return episode_tables[imdb_id][1]
+    table = {}
+    for video in videos:
+        try:
+            key = (int(video.get('season')), int(video.get('episode')))
+        except (TypeError, ValueError):
+            continue
+        table[key] = _format_episode(video, *key)
+    loaded_at = monotonic() - (EPISODE_TABLE_REFRESH if from_cache else 0)
+    episode_tables[imdb_id] = (loaded_at, table)
+    episode_tables.move_to_end(imdb_id)
+    while len(episode_tables) > EPISODE_TABLES_MAX:
+        episode_tables.popitem(last=False)
+    return table
+
+
+def _fresh_table(imdb_id: str) -> Optional[Dict[Tuple[int, int], Dict[str, Any]]]:
+    entry = episode_tables.get(imdb_id)
+    if entry is None or monotonic() - entry[0] > EPISODE_TABLE_TTL:
         return None
+    return entry[1]
+
+
+def cached_episode(imdb_id: str, season_id: int, episode_id: int) -> Optional[Dict[str, Any]]:
+    """Episode from an already loaded table, without touching the network."""
+    table = _fresh_table(imdb_id)
+    return table.get((int(season_id), int(episode_id))) if table else None
+
 
 async def get_season(imdb_id: str, season_id: int, episode_id: int) -> Optional[Dict[str, Any]]:
-    async with httpx.AsyncClient() as client:
-        try:
-            url = f"{BASE_URL}/meta/series/{imdb_id}.json"
-            response = await client.get(url, timeout=10.0)
-            if response.status_code != 200:
-                return None
-            data = response.json()
-            
-            if 'meta' in data and 'videos' in data['meta']:
-                for video in data['meta']['videos']:
-                    if (str(video.get('season', '')) == str(season_id) and 
-                        str(video.get('episode', '')) == str(episode_id)):
-                        return {
-                            'title': video.get('title', f'Episode {episode_id}'),
-                            'no': str(episode_id),
-                            'season': str(season_id),
-                            'image': video.get('thumbnail', ''),
-                            'plot': video.get('overview', ''),
-                            'released': video.get('released', '')
-                        }
-            
-            return None   
-        except Exception:
+    key = (int(season_id), int(episode_id))
+    table = _fresh_table(imdb_id)
+    if table is not None:
+        # A miss on a recent table is an episode Cinemeta does not know yet;
+        # only re-download once the table is old enough to have changed.
+        if key in table or monotonic() - episode_tables[imdb_id][0] < EPISODE_TABLE_REFRESH:
+            return table.get(key)
+
+    client = get_client()
+    try:
+        url = f"{BASE_URL}/meta/series/{imdb_id}.json"
+        response = await client.get(url)
+        raise_for_retryable(response)
+        if response.status_code != 200:
             return None
+        data = response.json()
+        
+        if 'meta' in data and 'videos' in data['meta']:
+            return index_episodes(imdb_id, data['meta']['videos']).get(key)
+        
+        return None   
+    except (ProviderError, httpx.TransportError):
+        raise
+    except Exception:
+        return None
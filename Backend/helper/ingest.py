@@ -0,0 +1,183 @@
+from asyncio import Queue, create_task, gather, wait_for, TimeoutError as AsyncTimeoutError
+from collections import defaultdict
+from typing import Dict, List, Tuple
+from bson.errors import InvalidDocument
+from pyrogram.types import Message
+import Backend
+from Backend import db
+from Backend.config import Telegram
+from Backend.helper.dedup import ingest_index
+from Backend.helper.journal import journal
+from Backend.helper.locks import title_lock
+from Backend.helper.metadata import metadata
+from Backend.helper.parser import clean_filename, remove_urls
+from Backend.helper.pyro import get_readable_file_size
+from Backend.helper.task_manager import edit_message
+from Backend.logger import LOGGER
+
+
+metadata_queue = Queue()
+file_queue = Queue()
+ingest_stats = {
+    "received": 0, "skipped_unchanged": 0, "skipped_duplicate": 0,
+    "unresolved": 0, "queued": 0, "committed": 0, "failed": 0, "deferred": 0, "batches": 0
+}
+# Errors in the entry itself; retrying the write after a restart cannot fix them.
+PERMANENT_ERRORS = (InvalidDocument, KeyError, TypeError, ValueError)
+
+
+def make_job(message: Message, default_id: str = None) -> dict:
+    file = message.video or message.document
+    title = message.caption or file.file_name
+    return {
+        "filename": clean_filename(title),
+        "title": title,
+        "channel": int(str(message.chat.id).replace("-100", "")),
+        "msg_id": message.id,
+        "size": get_readable_file_size(file.file_size),
+        # "" when no hint is active, so metadata() never falls back to a
+        # USE_DEFAULT_ID set after this file arrived.
+        "default_id": (Backend.USE_DEFAULT_ID or "") if default_id is None else default_id,
+        "caption": message.caption,
+        "chat_id": message.chat.id,
+        "file_info": {
+            "file_unique_id": file.file_unique_id,
+            "size_bytes": file.file_size,
+            "mime_type": file.mime_type
+        }
+    }
+
+
+async def enqueue_job(job: dict) -> bool:
+    # Checked before any metadata call: caption edits that change nothing
+    # and re-forwards of a file we already have cost no provider traffic.
+    reason = await ingest_index.check(job)
+    if reason:
+        ingest_stats[f"skipped_{reason}"] += 1
+        LOGGER.debug(f"Skipping {reason} file: {job['title']} (ID: {job['msg_id']})")
+        return False
+
+    ingest_index.begin(job)
+    journal.received(journal.key(job["channel"], job["msg_id"]), job)
+    await metadata_queue.put(job)
+    ingest_stats["received"] += 1
+    return True
+
+
+async def _resolve_metadata(job: dict):
+    key = journal.key(job["channel"], job["msg_id"])
+    metadata_info = await metadata(job["filename"], job["channel"], job["msg_id"], job["default_id"])
+    if metadata_info is None:
+        journal.done(key)
+        ingest_index.abandon(job["file_info"]["file_unique_id"])
+        ingest_stats["unresolved"] += 1
+        LOGGER.warning(f"Metadata failed for file: {job['title']} (ID: {job['msg_id']})")
+        return
+
+    title = remove_urls(job["title"])
+    if not title.endswith(('.mkv', '.mp4')):
+        title += '.mkv'
+
+    if job["default_id"]:
+        new_caption = (job["caption"] + "\n\n" + job["default_id"]) if job["caption"] else job["default_id"]
+        # The edit comes back as an edited message; make it a known caption.
+        ingest_index.add_signature(job["file_info"]["file_unique_id"], new_caption)
+        create_task(edit_message(
+            chat_id=job["chat_id"],
+            msg_id=job["msg_id"],
+            new_caption=new_caption
+        ))
+
+    entry = (metadata_info, job["channel"], job["msg_id"], job["size"], title, job["file_info"])
+    journal.resolved(key, entry)
+    await file_queue.put(entry)
+    ingest_stats["queued"] += 1
+
+
+async def metadata_worker():
+    # Several of these run side by side; the per-provider rate limiters, not
+    # a fixed sleep, decide how fast Cinemeta and TMDb are called.
+    while True:
+        job = await metadata_queue.get()
+        try:
+            await _resolve_metadata(job)
+        except Exception as e:
+            journal.done(journal.key(job["channel"], job["msg_id"]))
+            ingest_index.abandon(job["file_info"]["file_unique_id"])
+            ingest_stats["unresolved"] += 1
+            LOGGER.error(f"Metadata worker error for {job['title']}: {e}")
+        finally:
+            metadata_queue.task_done()
+
+
+async def _collect_batch() -> List[tuple]:
+    # Block for the first file, then keep draining for a short window so a
+    # forwarded season lands in the same batch.
+    batch = [await file_queue.get()]
+    while len(batch) < Telegram.INGEST_BATCH_SIZE:
+        try:
+            batch.append(await wait_for(file_queue.get(), timeout=Telegram.INGEST_BATCH_WAIT))
+        except AsyncTimeoutError:
+            break
+    return batch
+
+
+async def _commit_group(key: Tuple[str, int], entries: List[tuple]):
+    permanent = False
+    async with title_lock(key):
+        try:
+            updated_id = await db.insert_media_group(entries)
+        except PERMANENT_ERRORS as e:
+            LOGGER.error(f"Ingest rejected for {key[0]} {key[1]}: {e}")
+            updated_id, permanent = None, True
+        except Exception as e:
+            LOGGER.error(f"Ingest failed for {key[0]} {key[1]}: {e}")
+            updated_id = None
+
+    if updated_id or permanent:
+        for entry in entries:
+            journal.done(journal.key(entry[1], entry[2]))
+
+    if updated_id:
+        try:
+            await ingest_index.commit(entries)
+        except Exception as e:
+            LOGGER.error(f"Ingest index update failed for {key[0]} {key[1]}: {e}")
+        ingest_stats["committed"] += len(entries)
+        LOGGER.info(f"{key[0]} updated with ID: {updated_id} ({len(entries)} file(s))")
+        return
+
+    for entry in entries:
+        if len(entry) > 5 and entry[5]:
+            ingest_index.abandon(entry[5].get("file_unique_id"))
+    if permanent:
+        ingest_stats["failed"] += len(entries)
+        LOGGER.info(f"Update failed for {key[0]} {key[1]} ({len(entries)} file(s))")
+    else:
+        # Left open in the journal, so the next start writes them again.
+        ingest_stats["deferred"] += len(entries)
+        LOGGER.warning(f"Update deferred for {key[0]} {key[1]} ({len(entries)} file(s)); kept for replay")
+
+
+async def ingest_worker():
+    while True:
+        batch = await _collect_batch()
+        groups: Dict[Tuple[str, int], List[tuple]] = defaultdict(list)
+        for entry in batch:
+            metadata_info = entry[0]
+            groups[(metadata_info["media_type"], int(metadata_info["tmdb_id"]))].append(entry)
+
+        ingest_stats["batches"] += 1
+        await gather(*(_commit_group(key, entries) for key, entries in groups.items()))
+        for _ in batch:
+            file_queue.task_done()
+
+
+async def replay_journal():
+    jobs, entries = await journal.replay()
+    for job in jobs:
+        await metadata_queue.put(job)
+    for entry in entries:
+        await file_queue.put(entry)
+    if jobs or entries:
+        LOGGER.info(f"Ingest journal: replaying {len(jobs)} unresolved and {len(entries)} unsaved file(s)")
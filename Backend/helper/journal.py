@@ -0,0 +1,133 @@
+import json
+import os
+from asyncio import Event, sleep, to_thread, wait_for, TimeoutError as AsyncTimeoutError
+from typing import Any, Dict, List, Tuple
+from Backend.config import Telegram
+from Backend.logger import LOGGER
+
+
+class IngestJournal:
+    """Append-only JSONL log of files moving through ingestion.
+
+    Each file is recorded as "received" (waiting for metadata), "resolved"
+    (waiting for the DB write) and finally "done". Records are buffered and
+    written with one fsync per flush interval, so receiving a file never waits
+    on the disk. Whatever is not done when the process stops is handed back to
+    the queues on the next start.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.pending: Dict[str, dict] = {}
+        self.buffer: List[str] = []
+        self.wakeup = Event()
+        self.finished_since_compaction = 0
+        self.stats = {"appended": 0, "flushes": 0, "replayed": 0, "compactions": 0}
+
+    @staticmethod
+    def key(channel: int, msg_id: int) -> str:
+        return f"{channel}:{msg_id}"
+
+    def _append(self, record: dict):
+        self.buffer.append(json.dumps(record, default=str, separators=(",", ":")))
+        self.stats["appended"] += 1
+        if len(self.buffer) >= Telegram.INGEST_JOURNAL_BATCH:
+            self.wakeup.set()
+
+    def received(self, key: str, job: dict):
+        record = {"op": "received", "key": key, "job": job}
+        self.pending[key] = record
+        self._append(record)
+
+    def resolved(self, key: str, entry: tuple):
+        record = {"op": "resolved", "key": key, "entry": list(entry)}
+        self.pending[key] = record
+        self._append(record)
+
+    def done(self, key: str):
+        if self.pending.pop(key, None) is None:
+            return
+        self.finished_since_compaction += 1
+        self._append({"op": "done", "key": key})
+
+    def _write(self, lines: List[str]):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    async def flush(self):
+        if not self.buffer:
+            return
+        lines, self.buffer = self.buffer, []
+        try:
+            await to_thread(self._write, lines)
+        except Exception:
+            self.buffer = lines + self.buffer
+            raise
+        self.stats["flushes"] += 1
+
+    def _read(self) -> Dict[str, dict]:
+        state: Dict[str, dict] = {}
+        if not os.path.exists(self.path):
+            return state
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A torn last line from a crash mid-write.
+                    continue
+                if record.get("op") == "done":
+                    state.pop(record.get("key"), None)
+                else:
+                    state[record["key"]] = record
+        return state
+
+    def _rewrite(self, records: List[dict]):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, default=str, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    async def compact(self):
+        # Flush first so nothing buffered is lost, then keep only open items.
+        await self.flush()
+        await to_thread(self._rewrite, list(self.pending.values()))
+        self.finished_since_compaction = 0
+        self.stats["compactions"] += 1
+
+    async def replay(self) -> Tuple[List[dict], List[tuple]]:
+        """Load unfinished items: jobs still needing metadata and entries still needing a write."""
+        state = await to_thread(self._read)
+        self.pending = state
+        jobs = [record["job"] for record in state.values() if record["op"] == "received"]
+        entries = [tuple(record["entry"]) for record in state.values() if record["op"] == "resolved"]
+        self.stats["replayed"] = len(jobs) + len(entries)
+        await self.compact()
+        return jobs, entries
+
+    async def run(self):
+        while True:
+            try:
+                await wait_for(self.wakeup.wait(), timeout=Telegram.INGEST_JOURNAL_FLUSH_INTERVAL)
+            except AsyncTimeoutError:
+                pass
+            self.wakeup.clear()
+            try:
+                if self.finished_since_compaction >= Telegram.INGEST_JOURNAL_COMPACT_AFTER:
+                    await self.compact()
+                else:
+                    await self.flush()
+            except Exception as e:
+                LOGGER.error(f"Ingest journal write failed: {e}")
+                await sleep(1)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "open": len(self.pending), "buffered": len(self.buffer)}
+
+
+journal = IngestJournal(Telegram.INGEST_JOURNAL_PATH)
@@ -0,0 +1,13 @@
+from asyncio import Lock
+from typing import Tuple
+
+
+# A fixed pool of locks striped by title; titles sharing a stripe simply
+# take turns, and nothing grows with the size of the library.
+TITLE_LOCK_STRIPES = 256
+_title_locks = [Lock() for _ in range(TITLE_LOCK_STRIPES)]
+
+
+def title_lock(key: Tuple[str, int]) -> Lock:
+    """Serializes writes to one title across ingest, rebalancing and migrations."""
+    return _title_locks[hash(key) % TITLE_LOCK_STRIPES]
@@ -1,17 +1,16 @@
-import asyncio
+import logging
 import traceback
-import PTN
-from re import compile, IGNORECASE
-from Backend.helper.imdb import get_detail, get_season, search_title
-from Backend.helper.pyro import extract_tmdb_id
+from Backend.helper.imdb import cached_episode, get_detail, get_season, index_episodes, search_title
+from Backend.helper.parser import extract_tmdb_id, parse_filename
 from themoviedb import aioTMDb
 from Backend.config import Telegram
 import Backend
 from Backend.logger import LOGGER
 from Backend.helper.encrypt import encode_string
+from Backend.helper.metadata_cache import metadata_cache, search_key
+from Backend.helper.providers import call_provider
 
 # ----------------- Configuration -----------------
-DELAY = 2
 tmdb = aioTMDb(key=Telegram.TMDB_API, language="en-US", region="US")
 
 # ----------------- Helpers -----------------
@@ -28,68 +27,72 @@ def format_imdb_images(imdb_id: str) -> dict:
 async def safe_imdb_search(title: str, type_: str) -> str | None:
     """Safely search IMDb title and return its ID."""
     try:
-        result = await search_title(query=title, type=type_)
+        result = await metadata_cache.get_or_load(
+            search_key("cinemeta", type_, title),
+            lambda: call_provider("cinemeta", lambda: search_title(query=title, type=type_))
+        )
         return result["id"] if result else None
     except Exception as e:
         LOGGER.warning(f"IMDb search failed for '{title}' [{type_}]: {e}")
         return None
 
-async def safe_tmdb_search(title: str, type_: str, year=None):
-    """Safely search TMDb title."""
-    try:
+async def safe_tmdb_search(title: str, type_: str, year=None) -> int | None:
+    """Safely search TMDb title and return its ID."""
+    async def search():
         if type_ == "movie":
             if year:
-                results = await tmdb.search().movies(query=title, year=year)
+                results = await call_provider("tmdb", lambda: tmdb.search().movies(query=title, year=year))
             else:
-                results = await tmdb.search().movies(query=title)
+                results = await call_provider("tmdb", lambda: tmdb.search().movies(query=title))
         else:
-            results = await tmdb.search().tv(query=title)
-        return results[0] if results else None
+            results = await call_provider("tmdb", lambda: tmdb.search().tv(query=title))
+        return results[0].id if results else None
+
+    try:
+        return await metadata_cache.get_or_load(search_key("tmdb", type_, title, year), search)
     except Exception as e:
         LOGGER.error(f"TMDb search failed for '{title}' [{type_}]: {e}")
         return None
 
+async def cached_imdb_detail(imdb_id: str) -> dict | None:
+    # Includes the series' episode list, so every episode file of a show is
+    # served from one Cinemeta lookup.
+    return await metadata_cache.get_or_load(
+        f"cinemeta:detail:{imdb_id}",
+        lambda: call_provider("cinemeta", lambda: get_detail(imdb_id=imdb_id))
+    )
+
+async def cached_tmdb(key: str, request):
+    # TMDb client objects are not BSON-serializable, so these stay in memory.
+    return await metadata_cache.get_or_load(key, lambda: call_provider("tmdb", request), persist=False)
+
 # ----------------- Main Entry -----------------
-async def metadata(filename: str, channel: int, msg_id) -> dict | None:
-    try:
-        parsed = PTN.parse(filename)
-    except Exception as e:
-        LOGGER.error(f"PTN parsing failed for {filename}: {e}\n{traceback.format_exc()}")
-        return None
-    
-    # Skip combined/invalid files
-    if "excess" in parsed and any("combined" in item.lower() for item in parsed["excess"]):
-        LOGGER.info(f"Skipping {filename}: contains 'combined'")
-        return None
-    
-    # Skip split/multipart files
-    multipart_pattern = compile(r'(?:part|cd|disc|disk)[s._-]*\d+(?=\.\w+$)', IGNORECASE)
-    if multipart_pattern.search(filename):
-        LOGGER.info(f"Skipping {filename}: seems to be a split/multipart file")
-        return None
-    
-    title = parsed.get("title")
-    season = parsed.get("season")
-    episode = parsed.get("episode")
-    year = parsed.get("year")
-    quality = parsed.get("resolution")
-    
-    if not quality:
-        LOGGER.warning(f"Skipping {filename}: No resolution (parsed={parsed})")
-        return None
-    
-    if isinstance(season, list) or isinstance(episode, list):
-        LOGGER.warning(f"Invalid season/episode format for {filename}: {parsed}")
-        return None
-    
-    if season and not episode:
-        LOGGER.warning(f"Missing episode in {filename}: {parsed}")
+SKIP_MESSAGES = {
+    "unparseable": (logging.ERROR, "PTN parsing failed"),
+    "combined": (logging.INFO, "contains 'combined'"),
+    "multipart": (logging.INFO, "seems to be a split/multipart file"),
+    "no_resolution": (logging.WARNING, "No resolution"),
+    "invalid_episode": (logging.WARNING, "Invalid season/episode format"),
+    "missing_episode": (logging.WARNING, "Missing episode"),
+    "no_title": (logging.INFO, "No title parsed"),
+}
+
+async def metadata(filename: str, channel: int, msg_id, default_id_hint: str | None = None) -> dict | None:
+    parsed = parse_filename(filename)
+    if parsed.skip:
+        level, reason = SKIP_MESSAGES[parsed.skip]
+        LOGGER.log(level, f"Skipping {filename}: {reason} (parsed={parsed.parsed})")
         return None
+
+    title, season, episode = parsed.title, parsed.season, parsed.episode
+    year, quality = parsed.year, parsed.resolution
     
     # Extract TMDb/IMDb hint
     default_id = None
     try:
-        default_id = extract_tmdb_id(Backend.USE_DEFAULT_ID)
+        # The hint is captured when the file arrives; USE_DEFAULT_ID may have
+        # changed by the time a queued file is resolved.
+        default_id = extract_tmdb_id(Backend.USE_DEFAULT_ID if default_id_hint is None else default_id_hint)
     except Exception:
         pass
     
@@ -99,10 +102,6 @@ async def metadata(filename: str, channel: int, msg_id) -> dict | None:
         except Exception:
             pass
     
-    if not title:
-        LOGGER.info(f"No title parsed from: {filename} (parsed={parsed})")
-        return None
-    
     data = {"chat_id": channel, "msg_id": msg_id}
     encoded_string = await encode_string(data)
     
@@ -125,34 +124,50 @@ async def fetch_tv_metadata(title, season, episode, encoded_string, year=None, q
     # Try IMDb first
     if imdb_id:
         try:
-            await asyncio.sleep(DELAY)
-            tv_details = await get_detail(imdb_id=imdb_id)
-            await asyncio.sleep(DELAY)
-            ep_details = await get_season(imdb_id=imdb_id, season_id=season, episode_id=episode)
+            tv_details = await cached_imdb_detail(imdb_id)
+            if tv_details and tv_details.get("videos"):
+                index_episodes(imdb_id, tv_details["videos"], replace=False, from_cache=True)
+            ep_details = cached_episode(imdb_id, season, episode)
+            if ep_details is None:
+                ep_details = await call_provider(
+                    "cinemeta", lambda: get_season(imdb_id=imdb_id, season_id=season, episode_id=episode)
+                )
         except Exception as e:
             LOGGER.warning(f"IMDb TV fetch failed [{imdb_id}]: {e}")
     
     # IMDb failed → fallback to TMDb
     if not tv_details and not ep_details:
         use_tmdb = True
-        tmdb_result = await safe_tmdb_search(title, "tv")
-        if not tmdb_result:
+        tv_id = await safe_tmdb_search(title, "tv")
+        if not tv_id:
             LOGGER.warning(f"No TMDb result for '{title}'")
             return None
         
-        tv_id = tmdb_result.id
         try:
-            tv_details = await tmdb.tv(tv_id).details(append_to_response="external_ids")
+            tv_details = await cached_tmdb(
+                f"tmdb:tv:{tv_id}", lambda: tmdb.tv(tv_id).details(append_to_response="external_ids")
+            )
         except Exception as e:
             LOGGER.warning(f"TMDb TV details failed for {title}: {e}")
             return None
         
-        # Fetch episode safely
+        # Fetch episode safely: one season request covers all of its episodes
         try:
-            ep_details = await tmdb.episode(tv_id, season, episode).details()
+            season_details = await cached_tmdb(
+                f"tmdb:season:{tv_id}:{season}", lambda: tmdb.season(tv_id, season).details()
+            )
+            ep_details = next(
+                (ep for ep in (getattr(season_details, "episodes", None) or []) if ep.episode_number == episode), None
+            )
         except Exception as e:
-            LOGGER.warning(f"TMDb episode not found for {title} S{season}E{episode}: {e}")
+            LOGGER.debug(f"TMDb season fetch failed for {title} S{season}: {e}")
             ep_details = None
+        if ep_details is None:
+            try:
+                ep_details = await call_provider("tmdb", lambda: tmdb.episode(tv_id, season, episode).details())
+            except Exception as e:
+                LOGGER.warning(f"TMDb episode not found for {title} S{season}E{episode}: {e}")
+                ep_details = None
     
     # Return TMDb-based data
     if use_tmdb and tv_details:
@@ -212,20 +227,22 @@ async def fetch_movie_metadata(title, encoded_string, year=None, quality=None, d
     # Try IMDb first
     if imdb_id:
         try:
-            movie_details = await get_detail(imdb_id=imdb_id)
+            movie_details = await cached_imdb_detail(imdb_id)
         except Exception as e:
             LOGGER.warning(f"IMDb movie fetch failed [{title}]: {e}")
     
     # IMDb failed → fallback to TMDb
     if not movie_details:
         use_tmdb = True
-        tmdb_result = await safe_tmdb_search(title, "movie", year)
-        if not tmdb_result:
+        movie_id = await safe_tmdb_search(title, "movie", year)
+        if not movie_id:
             LOGGER.warning(f"No TMDb movie found for '{title}'")
             return None
         
         try:
-            movie_details = await tmdb.movie(tmdb_result.id).details(append_to_response="external_ids")
+            movie_details = await cached_tmdb(
+                f"tmdb:movie:{movie_id}", lambda: tmdb.movie(movie_id).details(append_to_response="external_ids")
+            )
         except Exception as e:
             LOGGER.warning(f"TMDb movie details failed for {title}: {e}")
             return None
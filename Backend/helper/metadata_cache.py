@@ -0,0 +1,120 @@
+from asyncio import Future, get_running_loop
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from re import sub
+from time import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from Backend import db
+from Backend.config import Telegram
+from Backend.logger import LOGGER
+
+
+def normalize_title(title: str) -> str:
+    return " ".join(sub(r"[^\w]+", " ", str(title).lower()).split())
+
+
+def search_key(provider: str, type_: str, title: str, year=None) -> str:
+    return f"{provider}:search:{type_}:{normalize_title(title)}:{year or ''}"
+
+
+class MetadataCache:
+    """Two-level cache for provider lookups: an in-process LRU in front of the
+    tracking DB's metadata_cache collection (expired by a TTL index).
+
+    Misses are cached too, for a shorter time, and concurrent lookups of the
+    same key share a single request.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.memory: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.max_entries = max_entries
+        self.inflight: Dict[str, Future] = {}
+        self.stats = {"memory_hits": 0, "db_hits": 0, "negative_hits": 0, "coalesced": 0, "misses": 0}
+
+    def _remember(self, key: str, value: Any, ttl: float):
+        self.memory[key] = (time() + ttl, value)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+    def _from_memory(self, key: str) -> Tuple[bool, Any]:
+        entry = self.memory.get(key)
+        if entry is None:
+            return False, None
+        if entry[0] < time():
+            del self.memory[key]
+            return False, None
+        self.memory.move_to_end(key)
+        return True, entry[1]
+
+    async def get_or_load(
+        self, key: str, loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[float] = None, negative_ttl: Optional[float] = None, persist: bool = True
+    ) -> Any:
+        """Return the cached value for key, calling loader once on a miss.
+
+        Loader exceptions are not cached. Values stored with persist=True must
+        be BSON-serializable.
+        """
+        ttl = Telegram.METADATA_CACHE_TTL if ttl is None else ttl
+        negative_ttl = Telegram.METADATA_NEGATIVE_TTL if negative_ttl is None else negative_ttl
+
+        found, value = self._from_memory(key)
+        if found:
+            self.stats["negative_hits" if value is None else "memory_hits"] += 1
+            return value
+
+        pending = self.inflight.get(key)
+        if pending:
+            self.stats["coalesced"] += 1
+            return await pending
+
+        future = get_running_loop().create_future()
+        self.inflight[key] = future
+        try:
+            value = await self._load(key, loader, ttl, negative_ttl, persist)
+            future.set_result(value)
+            return value
+        except Exception as e:
+            future.set_exception(e)
+            # Retrieve it so an unawaited future does not log a warning.
+            future.exception()
+            raise
+        finally:
+            self.inflight.pop(key, None)
+
+    async def _load(self, key: str, loader, ttl: float, negative_ttl: float, persist: bool) -> Any:
+        if persist:
+            try:
+                document = await db.get_cached_metadata(key)
+            except Exception as e:
+                LOGGER.debug(f"Metadata cache read failed for {key}: {e}")
+                document = None
+            if document:
+                remaining = (document["expires_at"] - datetime.utcnow()).total_seconds()
+                self._remember(key, document["value"], max(remaining, 1))
+                self.stats["negative_hits" if document["value"] is None else "db_hits"] += 1
+                return document["value"]
+
+        self.stats["misses"] += 1
+        value = await loader()
+        lifetime = ttl if value is not None else negative_ttl
+        self._remember(key, value, lifetime)
+        if persist:
+            try:
+                await db.set_cached_metadata(key, value, datetime.utcnow() + timedelta(seconds=lifetime))
+            except Exception as e:
+                LOGGER.debug(f"Metadata cache write failed for {key}: {e}")
+        return value
+
+    def get_stats(self) -> dict:
+        hits = self.stats["memory_hits"] + self.stats["db_hits"] + self.stats["negative_hits"] + self.stats["coalesced"]
+        lookups = hits + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self.memory),
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0
+        }
+
+
+metadata_cache = MetadataCache()
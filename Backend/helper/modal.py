@@ -2,11 +2,18 @@ from datetime import datetime
 from typing import List, Optional
 from pydantic import BaseModel, Field
 
+SCHEMA_VERSION = 2
+
 class QualityDetail(BaseModel):
     quality: str 
     id: str 
     name: str 
     size: str 
+    chat_id: Optional[int] = None
+    msg_id: Optional[int] = None
+    file_unique_id: Optional[str] = None
+    size_bytes: Optional[int] = None
+    mime_type: Optional[str] = None
 
 class Episode(BaseModel):
     episode_number: int
@@ -33,6 +40,8 @@ class TVShowSchema(BaseModel):
     media_type: str
     updated_on: datetime = Field(default_factory=datetime.utcnow)
     seasons: List[Season] 
+    episode_layout: Optional[str] = None
+    schema_version: int = SCHEMA_VERSION
 
 class MovieSchema(BaseModel):
     tmdb_id: int
@@ -49,3 +58,4 @@ class MovieSchema(BaseModel):
     media_type: str
     updated_on: datetime = Field(default_factory=datetime.utcnow) 
     telegram: Optional[List[QualityDetail]]
+    schema_version: int = SCHEMA_VERSION
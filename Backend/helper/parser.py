@@ -0,0 +1,114 @@
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional
+import PTN
+
+
+# Compiled once at import; these run for every file that is ingested.
+MENTION_PATTERN = re.compile(r'_@[A-Za-z]+_|@[A-Za-z]+_|[\[\]\s@]*@[^.\s\[\]]+[\]\[\s@]*')
+NOISE_PATTERN = re.compile(
+    r'(?<=\W)(org|AMZN|DDP|DD|NF|AAC|TVDL|5\.1|2\.1|2\.0|7\.0|7\.1|5\.0|~|\b\w+kbps\b)(?=\W)', re.IGNORECASE
+)
+WHITESPACE_PATTERN = re.compile(r'\s+')
+URL_PATTERN = re.compile(r'\b(?:https?|ftp):\/\/[^\s/$.?#].[^\s]*')
+IMDB_URL_PATTERN = re.compile(r'/title/(tt\d+)')
+MULTIPART_PATTERN = re.compile(r'(?:part|cd|disc|disk)[s._-]*\d+(?=\.\w+$)', re.IGNORECASE)
+
+# Captions repeat across re-forwards, edits, journal replays and backfills.
+PARSE_CACHE_SIZE = 8192
+
+
+class ParsedName(NamedTuple):
+    title: Optional[str]
+    season: Any
+    episode: Any
+    year: Optional[int]
+    resolution: Optional[str]
+    # Why metadata() must not resolve this file, or None when it is usable.
+    skip: Optional[str]
+    # Raw PTN output (or the parse error), for logging only; shared by the memo.
+    parsed: Dict[str, Any]
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def clean_filename(filename):
+    if not filename:
+        return "unknown_file"
+
+    cleaned_filename = MENTION_PATTERN.sub('', filename)
+    cleaned_filename = NOISE_PATTERN.sub(' ', cleaned_filename)
+    cleaned_filename = WHITESPACE_PATTERN.sub(' ', cleaned_filename).strip().replace(' .', '.')
+
+    return cleaned_filename if cleaned_filename else "unknown_file"
+
+
+def remove_urls(text):
+    if not text:
+        return ""
+
+    text_without_urls = URL_PATTERN.sub('', text)
+    return WHITESPACE_PATTERN.sub(' ', text_without_urls).strip()
+
+
+def extract_tmdb_id(url):
+    # Match IMDb URLs
+    imdb_match = IMDB_URL_PATTERN.search(url)
+    if imdb_match:
+        return imdb_match.group(1)
+
+    return None
+
+
+def _skip_reason(filename: str, parsed: dict) -> Optional[str]:
+    if "excess" in parsed and any("combined" in str(item).lower() for item in parsed["excess"]):
+        return "combined"
+    if MULTIPART_PATTERN.search(filename):
+        return "multipart"
+    if not parsed.get("resolution"):
+        return "no_resolution"
+    if isinstance(parsed.get("season"), list) or isinstance(parsed.get("episode"), list):
+        return "invalid_episode"
+    if parsed.get("season") and not parsed.get("episode"):
+        return "missing_episode"
+    if not parsed.get("title"):
+        return "no_title"
+    return None
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_filename(filename: str) -> ParsedName:
+    """Parse a cleaned file name into the fields metadata() resolves on."""
+    try:
+        parsed = PTN.parse(filename)
+    except Exception as e:
+        return ParsedName(None, None, None, None, None, "unparseable", {"error": str(e)})
+
+    return ParsedName(
+        title=parsed.get("title"),
+        season=parsed.get("season"),
+        episode=parsed.get("episode"),
+        year=parsed.get("year"),
+        resolution=parsed.get("resolution"),
+        skip=_skip_reason(filename, parsed),
+        parsed=parsed
+    )
+
+
+def parse_batch(filenames: List[str]) -> List[ParsedName]:
+    """Parse many names at once; repeated names are parsed a single time."""
+    distinct = {name: parse_filename(name) for name in dict.fromkeys(filenames)}
+    return [distinct[name] for name in filenames]
+
+
+def get_parse_stats() -> Dict[str, Any]:
+    stats = {}
+    for name, func in (("clean", clean_filename), ("parse", parse_filename)):
+        info = func.cache_info()
+        total = info.hits + info.misses
+        stats[name] = {
+            "hits": info.hits,
+            "misses": info.misses,
+            "size": info.currsize,
+            "hit_rate": round(info.hits / total, 3) if total else 0.0
+        }
+    return stats
@@ -1,7 +1,8 @@
 import asyncio
 import traceback
-import aiohttp
+import httpx
 from Backend.config import Telegram  
+from Backend.helper.http import get_client
 from Backend.logger import LOGGER
 
 async def ping():
@@ -12,12 +13,9 @@ async def ping():
     while True:
         await asyncio.sleep(sleep_time)
         try:
-            async with aiohttp.ClientSession(
-                timeout=aiohttp.ClientTimeout(total=10)
-            ) as session:
-                async with session.get(manifest_url) as resp:
-                    LOGGER.info(f"Pinged manifest URL — Status: {resp.status}")
-        except asyncio.TimeoutError:
+            resp = await get_client().get(manifest_url)
+            LOGGER.info(f"Pinged manifest URL — Status: {resp.status_code}")
+        except httpx.TimeoutException:
             LOGGER.warning("Timeout: Could not connect to manifest URL.")
         except Exception:
             LOGGER.error("Ping failed:\n" + traceback.format_exc())
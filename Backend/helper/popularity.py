@@ -0,0 +1,132 @@
+from asyncio import sleep
+from datetime import datetime
+from heapq import nlargest
+from time import time
+from typing import Dict, List, Optional, Tuple
+from Backend import db, timezone
+from Backend.config import Telegram
+from Backend.logger import LOGGER
+from Backend.pyrofork.bot import work_loads
+
+
+class PopularityTracker:
+    """Exponentially decayed play counters per file and per title."""
+
+    def __init__(self, half_life_hours: float):
+        self.half_life = half_life_hours * 3600
+        self.files: Dict[str, List[float]] = {}
+        self.titles: Dict[Tuple[str, int], List[float]] = {}
+        self.file_titles: Dict[str, Tuple[str, int]] = {}
+        self.dirty_files = set()
+        self.dirty_titles = set()
+        self.generation = 0
+
+    def _decayed(self, entry: List[float], now: float) -> float:
+        return entry[0] * 0.5 ** ((now - entry[1]) / self.half_life)
+
+    def _bump(self, table: dict, key, now: float, weight: float):
+        entry = table.get(key)
+        table[key] = [(self._decayed(entry, now) if entry else 0.0) + weight, now]
+
+    def register(self, id: str, media_type: str, tmdb_id: int):
+        self.file_titles[id] = ("tv" if media_type in ("tv", "series") else "movie", int(tmdb_id))
+
+    def record(self, id: str, weight: float = 1.0):
+        now = time()
+        self._bump(self.files, id, now, weight)
+        self.dirty_files.add(id)
+        title = self.file_titles.get(id)
+        if title:
+            self._bump(self.titles, title, now, weight)
+            self.dirty_titles.add(title)
+
+    def top_files(self, limit: int) -> List[Tuple[str, float]]:
+        now = time()
+        return nlargest(limit, ((id, self._decayed(entry, now)) for id, entry in self.files.items()), key=lambda x: x[1])
+
+    def top_titles(self, media_type: str, limit: int) -> List[Tuple[int, float]]:
+        now = time()
+        return nlargest(
+            limit,
+            ((tmdb_id, self._decayed(entry, now)) for (kind, tmdb_id), entry in self.titles.items() if kind == media_type),
+            key=lambda x: x[1]
+        )
+
+    def drain_dirty(self) -> List[dict]:
+        documents = [
+            {"_id": f"file:{id}", "kind": "file", "score": self.files[id][0], "updated": self.files[id][1],
+             "media_type": self.file_titles.get(id, (None, None))[0], "tmdb_id": self.file_titles.get(id, (None, None))[1]}
+            for id in self.dirty_files
+        ] + [
+            {"_id": f"title:{media_type}:{tmdb_id}", "kind": "title", "score": self.titles[(media_type, tmdb_id)][0],
+             "updated": self.titles[(media_type, tmdb_id)][1], "media_type": media_type, "tmdb_id": tmdb_id}
+            for media_type, tmdb_id in self.dirty_titles
+        ]
+        self.dirty_files.clear()
+        self.dirty_titles.clear()
+        return documents
+
+    def restore(self, documents: List[dict]):
+        for document in documents:
+            entry = [document["score"], document["updated"]]
+            if document["kind"] == "file":
+                id = document["_id"].removeprefix("file:")
+                self.files[id] = entry
+                if document.get("tmdb_id") is not None:
+                    self.file_titles[id] = (document["media_type"], document["tmdb_id"])
+            else:
+                self.titles[(document["media_type"], document["tmdb_id"])] = entry
+        self.generation += 1
+
+
+popularity = PopularityTracker(Telegram.POPULARITY_HALF_LIFE_HOURS)
+
+
+def _is_off_peak(hour: Optional[int] = None) -> bool:
+    start, _, end = Telegram.POPULARITY_WARM_HOURS.partition("-")
+    if not start or not end:
+        return False
+    hour = datetime.now(timezone).hour if hour is None else hour
+    start, end = int(start), int(end)
+    return start <= hour < end if start <= end else hour >= start or hour < end
+
+
+async def warm_popular_files():
+    # Imported here: the streaming routes sit above the helpers.
+    from Backend.fastapi.routes.stream_routes import get_streamer, resolve_stream
+
+    chunk_size = 1024 * 1024
+    for id, _ in popularity.top_files(Telegram.POPULARITY_WARM_TOP):
+        if sum(work_loads.values()) > 1:
+            LOGGER.debug("Popularity warmer yielding to active streams")
+            return
+        try:
+            entry = await resolve_stream(id)
+            index = min(work_loads, key=work_loads.get)
+            streamer = get_streamer(index)
+            file_id = await streamer.get_file_properties(chat_id=entry["chat_id"], message_id=entry["msg_id"])
+            last_chunk = max(file_id.file_size - 1, 0) // chunk_size * chunk_size
+            # Head for the opening burst, tail for the container index (MP4
+            # moov at the end, Matroska cues).
+            await streamer.prefetch(file_id, sorted({0, chunk_size, last_chunk}), chunk_size)
+        except Exception as e:
+            LOGGER.debug(f"Popularity warm-up failed for {id}: {e}")
+
+
+async def popularity_worker():
+    try:
+        popularity.restore(await db.load_popularity())
+    except Exception as e:
+        LOGGER.error(f"Failed to load popularity data: {e}")
+
+    while True:
+        await sleep(Telegram.POPULARITY_FLUSH_INTERVAL)
+        try:
+            documents = popularity.drain_dirty()
+            if documents:
+                await db.save_popularity(documents)
+                popularity.generation += 1
+            if _is_off_peak():
+                await warm_popular_files()
+        except Exception as e:
+            LOGGER.error(f"Popularity worker error: {e}")
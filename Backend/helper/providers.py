@@ -0,0 +1,86 @@
+from asyncio import TimeoutError as AsyncTimeoutError, sleep
+from random import uniform
+from time import monotonic
+from typing import Any, Awaitable, Callable, Optional
+from Backend.config import Telegram
+from Backend.helper.rate_limiter import TokenBucket
+from Backend.logger import LOGGER
+
+
+class ProviderError(Exception):
+    """Raised by provider clients for responses worth retrying (429 / 5xx)."""
+
+    def __init__(self, status: int, retry_after: Optional[float] = None):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+limiters = {
+    "cinemeta": TokenBucket(rate=Telegram.CINEMETA_RATE, capacity=max(1, Telegram.CINEMETA_RATE)),
+    "tmdb": TokenBucket(rate=Telegram.TMDB_RATE, capacity=max(1, Telegram.TMDB_RATE)),
+}
+provider_stats = {
+    name: {"calls": 0, "errors": 0, "retries": 0, "throttled": 0, "total_ms": 0.0, "max_ms": 0.0}
+    for name in limiters
+}
+
+
+def _status(error: Exception) -> Optional[int]:
+    # ProviderError and aiohttp's ClientResponseError (used by the TMDb client)
+    # carry .status; httpx errors carry it on the response.
+    status = getattr(error, "status", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, (AsyncTimeoutError, ConnectionError)):
+        return True
+    if type(error).__name__ in ("ConnectTimeout", "ReadTimeout", "ConnectError", "RemoteProtocolError"):
+        return True
+    status = _status(error)
+    return status is not None and (status == 429 or status >= 500)
+
+
+def _record_latency(stats: dict, started: float):
+    elapsed = (monotonic() - started) * 1000
+    stats["calls"] += 1
+    stats["total_ms"] += elapsed
+    stats["max_ms"] = max(stats["max_ms"], elapsed)
+
+
+async def call_provider(provider: str, request: Callable[[], Awaitable[Any]]) -> Any:
+    """Run one provider request under its rate limiter, retrying 429/5xx with jittered backoff."""
+    limiter = limiters[provider]
+    stats = provider_stats[provider]
+    for attempt in range(Telegram.METADATA_RETRIES + 1):
+        await limiter.acquire()
+        started = monotonic()
+        try:
+            result = await request()
+        except Exception as e:
+            _record_latency(stats, started)
+            if not _is_retryable(e) or attempt == Telegram.METADATA_RETRIES:
+                stats["errors"] += 1
+                raise
+            retry_after = getattr(e, "retry_after", None)
+            if _status(e) == 429:
+                stats["throttled"] += 1
+                # Everyone sharing this provider backs off, not just this call.
+                limiter.pause(retry_after or 1)
+            stats["retries"] += 1
+            delay = retry_after or uniform(0, min(30, 0.5 * 2 ** attempt))
+            LOGGER.debug(f"{provider} request failed ({e}), retry {attempt + 1} in {delay:.1f}s")
+            await sleep(delay)
+            continue
+        _record_latency(stats, started)
+        return result
+
+
+def get_provider_stats() -> dict:
+    return {
+        name: {**stats, "avg_ms": round(stats["total_ms"] / stats["calls"], 1) if stats["calls"] else 0.0}
+        for name, stats in provider_stats.items()
+    }
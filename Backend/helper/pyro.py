@@ -8,7 +8,6 @@ from aiofiles import open as aiopen
 from aiofiles.os import path as aiopath, remove as aioremove
 from pyrogram import Client
 from Backend.pyrofork.bot import StreamBot
-import re
 from pyrogram.types import BotCommand
 from pyrogram import enums
 
@@ -54,23 +53,6 @@ def get_readable_file_size(size_in_bytes):
     return f'{size_in_bytes:.2f}{SIZE_UNITS[index]}' if index > 0 else f'{size_in_bytes:.0f}B'
 
 
-def clean_filename(filename):
-    if not filename:
-        return "unknown_file"
-    
-    pattern = r'_@[A-Za-z]+_|@[A-Za-z]+_|[\[\]\s@]*@[^.\s\[\]]+[\]\[\s@]*'
-    cleaned_filename = re.sub(pattern, '', filename)
-    
-    cleaned_filename = re.sub(
-        r'(?<=\W)(org|AMZN|DDP|DD|NF|AAC|TVDL|5\.1|2\.1|2\.0|7\.0|7\.1|5\.0|~|\b\w+kbps\b)(?=\W)', 
-        ' ', cleaned_filename, flags=re.IGNORECASE
-    )
-    
-    cleaned_filename = re.sub(r'\s+', ' ', cleaned_filename).strip().replace(' .', '.')
-    
-    return cleaned_filename if cleaned_filename else "unknown_file"
-
-
 def get_readable_time(seconds: int) -> str:
     count = 0
     readable_time = ""
@@ -102,27 +84,6 @@ def get_readable_time(seconds: int) -> str:
     return readable_time
 
 
-def extract_tmdb_id(url):
-    # Match IMDb URLs
-    imdb_match = re.search(r'/title/(tt\d+)', url)
-    if imdb_match:
-        return imdb_match.group(1)
-    
-    return None
-
-
-def remove_urls(text):
-    if not text:
-        return ""
-    
-    url_pattern = r'\b(?:https?|ftp):\/\/[^\s/$.?#].[^\s]*'
-    text_without_urls = re.sub(url_pattern, '', text)
-    cleaned_text = re.sub(r'\s+', ' ', text_without_urls).strip()
-    
-    return cleaned_text
-
-
-
 async def restart_notification():
     chat_id, msg_id = 0, 0
     try:
@@ -155,6 +116,8 @@ commands = [
     BotCommand("set", "🎬 Manually add IMDb metadata"),
     BotCommand("log", "📄 Send the log file"),
     BotCommand("restart", "♻️ Restart the bot"),
+    BotCommand("migrate_episodes", "📦 Move TV episodes into their own collection"),
+    BotCommand("backfill", "📥 Index an existing channel's history"),
     BotCommand("eval", "🧠 Execute Python code safely"),
     BotCommand("shell", "💻 Run shell commands on the server"),
 ]
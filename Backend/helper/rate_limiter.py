@@ -0,0 +1,30 @@
+from asyncio import Lock, sleep
+from time import monotonic
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = monotonic()
+        self._lock = Lock()
+
+    def _refill(self):
+        now = monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, tokens: float = 1):
+        async with self._lock:
+            self._refill()
+            while self.tokens < tokens:
+                await sleep((tokens - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= tokens
+
+    def pause(self, seconds: float):
+        # Push the bucket into debt, e.g. after a FloodWait, so the next
+        # acquire waits out the penalty.
+        self._refill()
+        self.tokens = min(self.tokens, 0) - seconds * self.rate
@@ -0,0 +1,120 @@
+from asyncio import create_task, sleep
+from datetime import datetime
+from typing import Optional
+from Backend import db
+from Backend.config import Telegram
+from Backend.helper.locks import title_lock
+from Backend.logger import LOGGER
+from Backend.pyrofork.bot import work_loads
+
+
+rebalance_status = {
+    "state": "idle",
+    "moved": 0,
+    "bytes_moved": 0,
+    "source": None,
+    "collection": None,
+    "started_on": None,
+    "updated_on": None,
+    "error": None
+}
+_rebalance_task = None
+
+
+def _set_status(**fields):
+    rebalance_status.update(fields, updated_on=datetime.utcnow())
+
+
+async def _wait_for_quiet_reads():
+    # Active streams are the read load that matters here; moving documents
+    # while users are playing only competes with them for the clusters.
+    while sum(work_loads.values()) > Telegram.REBALANCE_MAX_STREAMS:
+        if rebalance_status["state"] != "paused":
+            _set_status(state="paused")
+            LOGGER.info("Rebalancer paused: streaming load is high")
+        await sleep(Telegram.REBALANCE_DELAY * 10)
+    if rebalance_status["state"] != "running":
+        _set_status(state="running")
+
+
+def _pick_destination(source: int) -> Optional[int]:
+    candidates = [
+        db_index for db_index, sample in db.capacity.items()
+        if db_index != source and sample["ratio"] < Telegram.REBALANCE_TARGET_RATIO
+    ]
+    return min(candidates, key=lambda db_index: db.capacity[db_index]["ratio"]) if candidates else None
+
+
+async def _rebalance_source(source: int, checkpoint: dict) -> bool:
+    target = Telegram.REBALANCE_TARGET_RATIO
+    for collection_name in ("movie", "tv"):
+        last_id = checkpoint.get("last_id") if (
+            checkpoint.get("source") == source and checkpoint.get("collection") == collection_name
+        ) else None
+        _set_status(source=source, collection=collection_name)
+
+        while db.capacity[source]["ratio"] > target:
+            await _wait_for_quiet_reads()
+            refs = await db.list_document_refs(source, collection_name, last_id, Telegram.REBALANCE_BATCH_SIZE)
+            if not refs:
+                break
+
+            for ref in refs:
+                destination = _pick_destination(source)
+                if destination is None:
+                    LOGGER.warning("Rebalancer stopped: no storage DB below the target fill ratio")
+                    return False
+                async with title_lock((collection_name, int(ref["tmdb_id"]))):
+                    size = await db.relocate_document(collection_name, ref["_id"], source, destination)
+                if size:
+                    _set_status(
+                        moved=rebalance_status["moved"] + 1,
+                        bytes_moved=rebalance_status["bytes_moved"] + size
+                    )
+                last_id = ref["_id"]
+                if db.capacity[source]["ratio"] <= target:
+                    break
+
+            await db.set_state("rebalance", {
+                "source": source,
+                "collection": collection_name,
+                "last_id": last_id,
+                "moved": rebalance_status["moved"],
+                "updated_on": datetime.utcnow()
+            })
+            await sleep(Telegram.REBALANCE_DELAY)
+    return True
+
+
+async def run_rebalance():
+    _set_status(state="running", moved=0, bytes_moved=0, error=None, started_on=datetime.utcnow())
+    try:
+        await db.refresh_stats()
+        checkpoint = await db.get_state("rebalance") or {}
+        sources = sorted(
+            (db_index for db_index, sample in db.capacity.items()
+             if sample["ratio"] > Telegram.REBALANCE_TARGET_RATIO),
+            key=lambda db_index: db.capacity[db_index]["ratio"],
+            reverse=True
+        )
+        for source in sources:
+            if not await _rebalance_source(source, checkpoint):
+                break
+
+        await db.set_state("rebalance", {
+            "source": None, "collection": None, "last_id": None, "finished_on": datetime.utcnow()
+        })
+        await db.refresh_stats()
+        _set_status(state="done", source=None, collection=None)
+        LOGGER.info(f"Rebalance finished: {rebalance_status['moved']} documents moved")
+    except Exception as e:
+        LOGGER.error(f"Rebalance failed: {e}")
+        _set_status(state="error", error=str(e))
+
+
+def start_rebalance() -> bool:
+    global _rebalance_task
+    if _rebalance_task and not _rebalance_task.done():
+        return False
+    _rebalance_task = create_task(run_rebalance())
+    return True
@@ -0,0 +1,44 @@
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import Hashable, Optional, Tuple
+from fastapi import Request
+
+
+def make_etag(body: bytes) -> str:
+    return f'"{blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+
+class ResponseCache:
+    """LRU of encoded response bodies, each tagged with the generation it was built for."""
+
+    def __init__(self, max_entries: int = 2048):
+        self.entries: "OrderedDict[str, Tuple[Hashable, str, bytes]]" = OrderedDict()
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str, generation: Hashable) -> Optional[Tuple[str, bytes]]:
+        entry = self.entries.get(key)
+        if not entry or entry[0] != generation:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[1], entry[2]
+
+    def put(self, key: str, generation: Hashable, body: bytes) -> str:
+        etag = make_etag(body)
+        self.entries[key] = (generation, etag, body)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return etag
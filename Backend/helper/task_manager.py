@@ -1,8 +1,14 @@
 from asyncio import sleep
 from pyrogram.errors import FloodWait
+import Backend
+from Backend.config import Telegram
 from Backend.logger import LOGGER
+from Backend.helper.rate_limiter import TokenBucket
 from Backend.pyrofork.bot import Helper
 
+delete_limiter = TokenBucket(rate=Telegram.DELETE_RATE)
+deletion_stats = {"deleted": 0, "batches": 0, "flood_waits": 0, "errors": 0}
+
 async def edit_message(chat_id: int, msg_id: int, new_caption: str):
     try:
         await Helper.edit_message_caption(
@@ -17,16 +23,45 @@ async def edit_message(chat_id: int, msg_id: int, new_caption: str):
     except Exception as e:
         LOGGER.error(f"Error while editing message {msg_id} in {chat_id}: {e}")
 
-async def delete_message(chat_id: int, msg_id: int):
+async def _delete_chunk(chat_id: int, msg_ids: list) -> int:
+    # A failing batch is halved until the messages that cannot be deleted are
+    # isolated, so only they are charged an attempt. FloodWait propagates.
+    await delete_limiter.acquire()
     try:
-        await Helper.delete_messages(
-            chat_id=chat_id,
-            message_ids=msg_id
-        )
-        await sleep(2)
-        LOGGER.info(f"Deleted message {msg_id} in {chat_id}")
-    except FloodWait as e:
-        LOGGER.warning(f"FloodWait for {e.value} seconds while deleting message {msg_id} in {chat_id}")
-        await sleep(e.value)
+        await Helper.delete_messages(chat_id=chat_id, message_ids=msg_ids)
+    except FloodWait:
+        raise
     except Exception as e:
-        LOGGER.error(f"Error while deleting message {msg_id} in {chat_id}: {e}")
+        if len(msg_ids) == 1:
+            LOGGER.error(f"Error while deleting message {msg_ids[0]} in {chat_id}: {e}")
+            deletion_stats["errors"] += 1
+            await Backend.db.fail_deletions(chat_id, msg_ids)
+            return 0
+        middle = len(msg_ids) // 2
+        return await _delete_chunk(chat_id, msg_ids[:middle]) + await _delete_chunk(chat_id, msg_ids[middle:])
+
+    await Backend.db.ack_deletions(chat_id, msg_ids)
+    return len(msg_ids)
+
+async def deletion_worker():
+    while True:
+        try:
+            chat_id, msg_ids = await Backend.db.next_deletion_batch(limit=100)
+            if not msg_ids:
+                await sleep(5)
+                continue
+
+            try:
+                deleted = await _delete_chunk(chat_id, msg_ids)
+            except FloodWait as e:
+                LOGGER.warning(f"FloodWait for {e.value} seconds while deleting {len(msg_ids)} messages in {chat_id}")
+                deletion_stats["flood_waits"] += 1
+                delete_limiter.pause(e.value)
+                continue
+
+            deletion_stats["deleted"] += deleted
+            deletion_stats["batches"] += 1
+            LOGGER.info(f"Deleted {deleted} of {len(msg_ids)} messages in {chat_id}")
+        except Exception as e:
+            LOGGER.error(f"Deletion worker error: {e}")
+            await sleep(5)
@@ -0,0 +1,69 @@
+from pyrogram import filters, Client, enums
+from pyrogram.types import Message
+from Backend.config import Telegram
+from Backend.helper.backfill import backfill_status, start_backfill, stop_backfill
+from Backend.helper.custom_filter import CustomFilters
+from Backend.logger import LOGGER
+
+
+USAGE = (
+    "<b>Usage:</b>\n"
+    "<code>/backfill &lt;channel_id&gt; [start_msg_id] [end_msg_id]</code> — index a channel's history\n"
+    "<code>/backfill status</code> — show progress\n"
+    "<code>/backfill stop</code> — stop after the current batches\n\n"
+    "Without a start id the scan resumes from the last checkpoint."
+)
+
+
+def format_status() -> str:
+    status = backfill_status
+    return (
+        f"📥 <b>Backfill:</b> <code>{status['state']}</code>\n\n"
+        f"Channel: <code>{status['chat_id']}</code>\n"
+        f"Messages scanned: <code>{status['scanned']}</code>\n"
+        f"Files queued: <code>{status['queued']}</code>\n"
+        f"Already indexed: <code>{status['skipped']}</code>\n"
+        f"Unparseable names: <code>{status['unparseable']}</code>\n"
+        f"Checkpoint: <code>{status['checkpoint']}</code>\n"
+        f"FloodWaits: <code>{status['flood_waits']}</code>"
+        + (f"\n\n⚠️ {status['error']}" if status["error"] else "")
+    )
+
+
+@Client.on_message(filters.command('backfill') & filters.private & CustomFilters.owner, group=10)
+async def backfill(client: Client, message: Message):
+    try:
+        args = message.command[1:]
+        if not args:
+            await message.reply_text(USAGE, quote=True, parse_mode=enums.ParseMode.HTML)
+            return
+        if args[0] == "status":
+            await message.reply_text(format_status(), quote=True, parse_mode=enums.ParseMode.HTML)
+            return
+        if args[0] == "stop":
+            text = "🛑 Backfill stopping after the current batches." if stop_backfill() else "No backfill is running."
+            await message.reply_text(text, quote=True)
+            return
+
+        if args[0] not in Telegram.AUTH_CHANNEL:
+            await message.reply_text("> Channel is not in AUTH_CHANNEL", quote=True)
+            return
+        chat_id = int(args[0])
+        start_id = int(args[1]) if len(args) > 1 else None
+        end_id = int(args[2]) if len(args) > 2 else None
+
+        if not start_backfill(chat_id, start_id, end_id):
+            await message.reply_text("A backfill is already running. Use <code>/backfill status</code>.",
+                                     quote=True, parse_mode=enums.ParseMode.HTML)
+            return
+        await message.reply_text(
+            f"📥 <b>Backfill started</b> for <code>{chat_id}</code>.\n"
+            f"Use <code>/backfill status</code> to follow progress.",
+            quote=True,
+            parse_mode=enums.ParseMode.HTML
+        )
+    except ValueError:
+        await message.reply_text(USAGE, quote=True, parse_mode=enums.ParseMode.HTML)
+    except Exception as e:
+        LOGGER.error(f"Error in /backfill handler: {e}")
+        await message.reply_text(f"⚠️ An error occurred: {e}")
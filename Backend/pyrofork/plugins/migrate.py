@@ -0,0 +1,26 @@
+from pyrogram import filters, Client, enums
+from pyrogram.types import Message
+from Backend import db
+from Backend.helper.custom_filter import CustomFilters
+from Backend.logger import LOGGER
+
+
+@Client.on_message(filters.command('migrate_episodes') & filters.private & CustomFilters.owner, group=10)
+async def migrate_episodes(client: Client, message: Message):
+    try:
+        status = await message.reply_text(
+            "<blockquote>📦 Moving TV episodes into the episodes collection...</blockquote>",
+            quote=True,
+            parse_mode=enums.ParseMode.HTML
+        )
+        result = await db.migrate_episode_layout()
+        await status.edit_text(
+            f"✅ <b>Episode migration complete!</b>\n\n"
+            f"Shows migrated: <code>{result['shows']}</code>\n"
+            f"Episodes written: <code>{result['episodes']}</code>\n\n"
+            f"Set <code>SPLIT_EPISODES=True</code> so new shows use the same layout.",
+            parse_mode=enums.ParseMode.HTML
+        )
+    except Exception as e:
+        LOGGER.error(f"Error in /migrate_episodes handler: {e}")
+        await message.reply_text(f"⚠️ An error occurred: {e}")
@@ -1,33 +1,17 @@
-from asyncio import create_task, sleep as asleep, Queue, Lock
-import Backend
-from Backend.helper.task_manager import edit_message
+from asyncio import create_task, sleep as asleep
 from Backend.logger import LOGGER
-from Backend import db
 from Backend.config import Telegram
-from Backend.helper.pyro import clean_filename, get_readable_file_size, remove_urls
-from Backend.helper.metadata import metadata
+from Backend.helper.ingest import enqueue_job, ingest_worker, make_job, metadata_worker
 from pyrogram import filters, Client
 from pyrogram.types import Message
 from pyrogram.errors import FloodWait
 from pyrogram.enums.parse_mode import ParseMode
 
 
-file_queue = Queue()
-db_lock = Lock()
-
-async def process_file():
-    while True:
-        metadata_info, channel, msg_id, size, title = await file_queue.get()
-        async with db_lock:
-            updated_id = await db.insert_media(metadata_info, channel=channel, msg_id=msg_id, size=size, name=title)
-            if updated_id:
-                LOGGER.info(f"{metadata_info['media_type']} updated with ID: {updated_id}")
-            else:
-                LOGGER.info("Update failed due to validation errors.")
-        file_queue.task_done()
-
-for _ in range(1):
-    create_task(process_file())
+for _ in range(Telegram.METADATA_WORKERS):
+    create_task(metadata_worker())
+for _ in range(Telegram.INGEST_WORKERS):
+    create_task(ingest_worker())
 
 @Client.on_edited_message(filters.channel & (filters.document | filters.video))
 @Client.on_message(filters.channel & (filters.document | filters.video))
@@ -35,30 +19,9 @@ async def file_receive_handler(client: Client, message: Message):
     if str(message.chat.id) in Telegram.AUTH_CHANNEL:
         try:
             if message.video or (message.document and message.document.mime_type.startswith("video/")):
-                file = message.video or message.document
-                title = message.caption or file.file_name
-                msg_id = message.id
-                size = get_readable_file_size(file.file_size)
-                channel = str(message.chat.id).replace("-100", "")
-
-                metadata_info = await metadata(clean_filename(title), int(channel), msg_id)
-                if metadata_info is None:
-                    LOGGER.warning(f"Metadata failed for file: {title} (ID: {msg_id})")
-                    return
-
-                title = remove_urls(title)
-                if not title.endswith(('.mkv', '.mp4')):
-                    title += '.mkv'
-
-                if Backend.USE_DEFAULT_ID:
-                    new_caption = (message.caption + "\n\n" + Backend.USE_DEFAULT_ID) if message.caption else Backend.USE_DEFAULT_ID
-                    create_task(edit_message(
-                        chat_id=message.chat.id,
-                        msg_id=message.id,
-                        new_caption=new_caption
-                    ))
-
-                await file_queue.put((metadata_info, int(channel), msg_id, size, title))
+                # Metadata lookups happen in the worker pool so a forwarded
+                # library is not resolved one file at a time.
+                await enqueue_job(make_job(message))
             else:
                 await message.reply_text("> Not supported")
         except FloodWait as e:
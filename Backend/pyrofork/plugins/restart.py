@@ -1,6 +1,7 @@
 from pyrogram import filters, Client, enums
 from pyrogram.types import Message
 from Backend.helper.custom_filter import CustomFilters
+from Backend.helper.journal import journal
 from Backend.logger import LOGGER
 from asyncio import create_subprocess_exec, gather
 from aiofiles import open as aiopen
@@ -22,6 +23,9 @@ async def restart(client: Client, message: Message):
         async with aiopen(".restartmsg", "w") as f:
             await f.write(f"{restart_message.chat.id}\n{restart_message.id}\n")
 
+        # Queued files are replayed from the journal after the exec.
+        await journal.flush()
+
         LOGGER.info("Restarting the bot using uv package manager...")
 
         uv_path = shutil.which("uv")
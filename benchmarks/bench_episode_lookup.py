@@ -0,0 +1,98 @@
+"""Time single-episode lookups on a large synthetic show.
+
+Compares the old full-document fetch + Python scan with the $filter
+projection used by Database._project_tv_season.
+
+    MONGO_URI="mongodb://localhost:27017" python benchmarks/bench_episode_lookup.py
+
+A scratch database (bench_episode_lookup) is created and dropped.
+"""
+import asyncio
+import os
+import random
+import time
+import motor.motor_asyncio
+
+SEASONS = int(os.getenv("SEASONS", "20"))
+EPISODES = int(os.getenv("EPISODES", "75"))
+QUALITIES = ["480p", "720p", "1080p"]
+ROUNDS = int(os.getenv("ROUNDS", "500"))
+TMDB_ID = 999999
+
+
+def build_show() -> dict:
+    return {
+        "tmdb_id": TMDB_ID,
+        "title": "Benchmark Show",
+        "media_type": "tv",
+        "seasons": [
+            {
+                "season_number": s,
+                "episodes": [
+                    {
+                        "episode_number": e,
+                        "title": f"Episode {e}",
+                        "episode_backdrop": f"https://example.org/{s}/{e}.jpg",
+                        "telegram": [
+                            {"quality": q, "id": "x" * 40, "name": f"Show.S{s:02}E{e:02}.{q}.mkv", "size": "1.00GB"}
+                            for q in QUALITIES
+                        ],
+                    }
+                    for e in range(1, EPISODES + 1)
+                ],
+            }
+            for s in range(1, SEASONS + 1)
+        ],
+    }
+
+
+async def scan_lookup(collection, season_number, episode_number):
+    tv_show = await collection.find_one({"tmdb_id": TMDB_ID})
+    for season in tv_show.get("seasons", []):
+        if season.get("season_number") == season_number:
+            for episode in season.get("episodes", []):
+                if episode.get("episode_number") == episode_number:
+                    return episode
+
+
+async def projected_lookup(collection, season_number, episode_number):
+    pipeline = [
+        {"$match": {"tmdb_id": TMDB_ID}},
+        {"$project": {"_id": 0, "season": {"$arrayElemAt": [{"$filter": {
+            "input": {"$ifNull": ["$seasons", []]}, "as": "s",
+            "cond": {"$eq": ["$$s.season_number", season_number]}
+        }}, 0]}}},
+        {"$project": {"episode": {"$arrayElemAt": [{"$filter": {
+            "input": {"$ifNull": ["$season.episodes", []]}, "as": "e",
+            "cond": {"$eq": ["$$e.episode_number", episode_number]}
+        }}, 0]}}},
+    ]
+    result = await collection.aggregate(pipeline).to_list(1)
+    return result[0].get("episode") if result else None
+
+
+async def timed(name, func, collection, targets):
+    start = time.perf_counter()
+    for season_number, episode_number in targets:
+        assert await func(collection, season_number, episode_number)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<12} {elapsed / len(targets) * 1000:8.3f} ms/lookup")
+
+
+async def main():
+    client = motor.motor_asyncio.AsyncIOMotorClient(os.getenv("MONGO_URI", "mongodb://localhost:27017"))
+    db = client["bench_episode_lookup"]
+    try:
+        await db["tv"].create_index("tmdb_id")
+        await db["tv"].insert_one(build_show())
+        targets = [(random.randint(1, SEASONS), random.randint(1, EPISODES)) for _ in range(ROUNDS)]
+        print(f"{SEASONS} seasons x {EPISODES} episodes x {len(QUALITIES)} qualities, {ROUNDS} lookups")
+        await timed("scan", scan_lookup, db["tv"], targets)
+        await timed("projected", projected_lookup, db["tv"], targets)
+    finally:
+        await client.drop_database("bench_episode_lookup")
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,133 @@
+"""Time and check file name parsing on a corpus of real release names.
+
+Compares the previous per-call path (clean_filename with inline re.sub
+patterns, PTN.parse, then the multipart regex compiled inside metadata())
+with Backend.helper.parser, both cold (memo cleared every round) and warm
+(the repeats a backfill or journal replay produces). Accuracy is scored
+per field against benchmarks/filename_corpus.jsonl, and the two paths must
+agree on every name.
+
+    python benchmarks/bench_filename_parse.py
+
+Needs parse-torrent-title installed; no database is used.
+"""
+import importlib.util
+import json
+import os
+import re
+import time
+import PTN
+
+ROUNDS = int(os.getenv("ROUNDS", "20"))
+FIELDS = ("title", "year", "season", "episode", "resolution", "skip")
+HERE = os.path.dirname(__file__)
+
+spec = importlib.util.spec_from_file_location(
+    "parser", os.path.join(HERE, "..", "Backend", "helper", "parser.py")
+)
+parser = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(parser)
+
+
+def old_clean_filename(filename):
+    if not filename:
+        return "unknown_file"
+    pattern = r'_@[A-Za-z]+_|@[A-Za-z]+_|[\[\]\s@]*@[^.\s\[\]]+[\]\[\s@]*'
+    cleaned_filename = re.sub(pattern, '', filename)
+    cleaned_filename = re.sub(
+        r'(?<=\W)(org|AMZN|DDP|DD|NF|AAC|TVDL|5\.1|2\.1|2\.0|7\.0|7\.1|5\.0|~|\b\w+kbps\b)(?=\W)',
+        ' ', cleaned_filename, flags=re.IGNORECASE
+    )
+    cleaned_filename = re.sub(r'\s+', ' ', cleaned_filename).strip().replace(' .', '.')
+    return cleaned_filename if cleaned_filename else "unknown_file"
+
+
+def old_parse(name: str) -> dict:
+    filename = old_clean_filename(name)
+    parsed = PTN.parse(filename)
+    skip = None
+    if "excess" in parsed and any("combined" in str(item).lower() for item in parsed["excess"]):
+        skip = "combined"
+    elif re.compile(r'(?:part|cd|disc|disk)[s._-]*\d+(?=\.\w+$)', re.IGNORECASE).search(filename):
+        skip = "multipart"
+    elif not parsed.get("resolution"):
+        skip = "no_resolution"
+    elif isinstance(parsed.get("season"), list) or isinstance(parsed.get("episode"), list):
+        skip = "invalid_episode"
+    elif parsed.get("season") and not parsed.get("episode"):
+        skip = "missing_episode"
+    elif not parsed.get("title"):
+        skip = "no_title"
+    return {field: parsed.get(field) for field in FIELDS[:-1]} | {"skip": skip}
+
+
+def new_parse(name: str) -> dict:
+    result = parser.parse_filename(parser.clean_filename(name))
+    return {field: getattr(result, field) for field in FIELDS}
+
+
+def clear_memo():
+    parser.clean_filename.cache_clear()
+    parser.parse_filename.cache_clear()
+
+
+def load_corpus() -> list:
+    with open(os.path.join(HERE, "filename_corpus.jsonl"), "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def score(corpus: list):
+    field_hits = dict.fromkeys(FIELDS, 0)
+    exact = 0
+    mismatches = []
+    for case in corpus:
+        result = new_parse(case["name"])
+        if result != old_parse(case["name"]):
+            raise SystemExit(f"Parser disagrees with the previous path on {case['name']!r}")
+        wrong = [field for field in FIELDS if result[field] != case[field]]
+        for field in FIELDS:
+            field_hits[field] += field not in wrong
+        exact += not wrong
+        if wrong:
+            mismatches.append((case["name"], {field: (result[field], case[field]) for field in wrong}))
+
+    total = len(corpus)
+    print(f"accuracy on {total} names: {exact / total:.1%} fully correct")
+    for field in FIELDS:
+        print(f"  {field:<11}{field_hits[field] / total:.1%}")
+    for name, fields in mismatches:
+        print(f"  miss {name}: " + ", ".join(f"{k} got {got!r} want {want!r}" for k, (got, want) in fields.items()))
+
+
+def bench(label: str, run_round, names: list, before_round=None) -> float:
+    elapsed = 0.0
+    for _ in range(ROUNDS):
+        if before_round:
+            before_round()
+        start = time.perf_counter()
+        run_round(names)
+        elapsed += time.perf_counter() - start
+    rate = len(names) * ROUNDS / elapsed
+    print(f"{label:<22}{rate:>12,.0f} names/s")
+    return rate
+
+
+def main():
+    corpus = load_corpus()
+    names = [case["name"] for case in corpus]
+    score(corpus)
+
+    print(f"\nthroughput ({len(names)} names x {ROUNDS} rounds)")
+    old = bench("previous path", lambda batch: [old_parse(name) for name in batch], names)
+    cold = bench("parser, cold memo", lambda batch: [new_parse(name) for name in batch], names, clear_memo)
+    warm = bench("parser, warm memo", lambda batch: [new_parse(name) for name in batch], names)
+    # A backfill batch where every name shows up twice (caption plus re-forward).
+    batch = bench(
+        "parse_batch, repeats", lambda batch: parser.parse_batch([parser.clean_filename(name) for name in batch]),
+        names * 2, clear_memo
+    )
+    print(f"\ncold {cold / old:.2f}x, warm {warm / old:.0f}x, batch {batch / old:.2f}x the previous path")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Time JSON encoding of typical API and Stremio payloads.
+
+Compares the previous path (convert_objectid_to_str walk + FastAPI's
+jsonable_encoder + stdlib json, as JSONResponse renders it) with
+Backend.fastapi.responses.dumps (orjson when installed).
+
+    python benchmarks/bench_json.py
+
+Needs fastapi and pymongo (for bson) installed; no database is used.
+"""
+import importlib.util
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+
+ROUNDS = int(os.getenv("ROUNDS", "300"))
+PAGE_SIZE = int(os.getenv("PAGE_SIZE", "100"))
+SEASONS = int(os.getenv("SEASONS", "20"))
+EPISODES = int(os.getenv("EPISODES", "40"))
+
+spec = importlib.util.spec_from_file_location(
+    "responses", os.path.join(os.path.dirname(__file__), "..", "Backend", "fastapi", "responses.py")
+)
+responses = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(responses)
+
+
+def convert_objectid_to_str(document):
+    for key, value in document.items():
+        if isinstance(value, ObjectId):
+            document[key] = str(value)
+        elif isinstance(value, list):
+            document[key] = [convert_objectid_to_str(item) if isinstance(item, dict) else item for item in value]
+        elif isinstance(value, dict):
+            document[key] = convert_objectid_to_str(value)
+    return document
+
+
+def build_movie(i: int) -> dict:
+    return {
+        "_id": ObjectId(),
+        "tmdb_id": 100000 + i,
+        "imdb_id": f"tt{1000000 + i}",
+        "db_index": 1,
+        "title": f"Benchmark Movie {i}",
+        "genres": ["Action", "Drama", "Thriller"],
+        "description": "A reasonably long synopsis for a film that exists only in a benchmark. " * 3,
+        "rating": 7.3,
+        "release_year": 2020,
+        "poster": f"https://image.tmdb.org/t/p/w500/{i}.jpg",
+        "backdrop": f"https://image.tmdb.org/t/p/original/{i}.jpg",
+        "logo": f"https://image.tmdb.org/t/p/original/{i}.png",
+        "media_type": "movie",
+        "updated_on": datetime.utcnow() - timedelta(minutes=i),
+        "telegram": [
+            {"quality": q, "id": "x" * 40, "name": f"Movie.{i}.{q}.mkv", "size": "1.00GB",
+             "chat_id": -1001234567890, "msg_id": i, "size_bytes": 1073741824}
+            for q in ("720p", "1080p", "2160p")
+        ],
+    }
+
+
+def build_series_meta() -> dict:
+    return {"meta": {
+        "id": "999999",
+        "type": "series",
+        "name": "Benchmark Show",
+        "description": "Synopsis " * 40,
+        "genres": ["Drama"],
+        "videos": [
+            {
+                "id": f"999999:{s}:{e}",
+                "title": f"Episode {e}",
+                "season": s,
+                "episode": e,
+                "thumbnail": f"https://image.tmdb.org/t/p/w500/{s}-{e}.jpg",
+                "imdb_id": "tt9999999",
+            }
+            for s in range(1, SEASONS + 1) for e in range(1, EPISODES + 1)
+        ],
+    }}
+
+
+def old_path(build):
+    payload = build()
+    if "movies" in payload:
+        payload["movies"] = [convert_objectid_to_str(doc) for doc in payload["movies"]]
+    return json.dumps(
+        jsonable_encoder(payload), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def new_path(build):
+    return responses.dumps(build())
+
+
+def timed(name, encode, build):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        encode(build)
+    elapsed = time.perf_counter() - start
+    print(f"  {name:<6} {elapsed / ROUNDS * 1000:8.3f} ms/response")
+
+
+def main():
+    movies = [build_movie(i) for i in range(PAGE_SIZE)]
+    meta = build_series_meta()
+    payloads = {
+        f"admin list page ({PAGE_SIZE} movies)": lambda: {"total_count": 5000, "movies": [dict(m) for m in movies]},
+        f"series meta ({SEASONS * EPISODES} episodes)": lambda: meta,
+    }
+    print(f"encoder: {'orjson' if responses.orjson else 'stdlib json'}, {ROUNDS} rounds")
+    for label, build in payloads.items():
+        print(label)
+        timed("old", old_path, build)
+        timed("new", new_path, build)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import asyncio
+from types import SimpleNamespace
+
+from Backend.helper import backfill
+
+
+class FakeClient:
+    """A channel whose messages are 1..last_id, all of them text posts."""
+
+    def __init__(self, last_id: int):
+        self.last_id = last_id
+
+    async def get_messages(self, chat_id, message_ids):
+        return [
+            SimpleNamespace(id=msg_id, empty=msg_id > self.last_id, video=None, document=None)
+            for msg_id in message_ids
+        ]
+
+
+class FakeDB:
+    def __init__(self):
+        self.state = {}
+
+    async def get_state(self, key):
+        return self.state.get(key)
+
+    async def set_state(self, key, value):
+        self.state[key] = value
+
+    async def indexed_message_ids(self, chat_id):
+        return set()
+
+
+def run(monkeypatch, last_id: int, start_id=None, state=None):
+    fake_db = FakeDB()
+    fake_db.state.update(state or {})
+    monkeypatch.setattr(backfill, "db", fake_db)
+    monkeypatch.setattr(backfill, "multi_clients", {0: FakeClient(last_id), 1: FakeClient(last_id)})
+    asyncio.run(backfill.run_backfill(-100123, start_id))
+    return fake_db.state["backfill:-100123"]["last_msg_id"]
+
+
+def test_checkpoint_stops_at_newest_message(monkeypatch):
+    # The channel ends mid-batch; the empty probe batches after it must not
+    # move the saved checkpoint, or later posts in that range are skipped.
+    assert run(monkeypatch, last_id=450, start_id=1) == 450
+    assert backfill.backfill_status["state"] == "done"
+    assert backfill.backfill_status["checkpoint"] == 450
+
+
+def test_resume_picks_up_messages_posted_after_a_run(monkeypatch):
+    state = {"backfill:-100123": {"last_msg_id": 450}}
+    assert run(monkeypatch, last_id=700, state=state) == 700